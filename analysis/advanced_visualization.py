@@ -13,17 +13,53 @@ Các visualization nâng cao bao gồm:
 """
 import pandas as pd
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 import matplotlib.dates as mdates
+import matplotlib.colors as mcolors
 import matplotlib.patches as mpatches
-from matplotlib.patches import FancyBboxPatch, ConnectionPatch
+from matplotlib.patches import FancyBboxPatch, ConnectionPatch, Circle
+from matplotlib.collections import PatchCollection, LineCollection
+from mpl_toolkits.mplot3d import Axes3D  # noqa: F401  (đăng ký projection='3d')
 from pathlib import Path
 from datetime import datetime, timedelta
+import atexit
+import io
+import logging
+import shutil
+import subprocess
+import textwrap
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future, wait
+from functools import lru_cache, wraps
 import numpy as np
 import seaborn as sns
 from typing import Dict, Optional, List, Tuple
 import warnings
 warnings.filterwarnings('ignore')
 
+logger = logging.getLogger("analysis.advanced_visualization")
+
+# Ghi file PNG ở background, dùng chung cho mọi AdvancedVisualizationService
+# Thoát chương trình: chờ các file đang ghi xong rồi mới tắt thread I/O
+_IO_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="viz-io")
+atexit.register(_IO_EXECUTOR.shutdown, wait=True)
+
+def _with_rc(method):
+    """Chạy method (vẽ + lưu biểu đồ) trong plt.rc_context(self._rc) của service."""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with plt.rc_context(self._rc):
+            return method(self, *args, **kwargs)
+    return wrapper
+
+try:
+    import numba
+    prange = numba.prange
+except ImportError:  # Numba là tùy chọn, fallback về NumPy
+    numba = None
+    prange = range
+
 # Professional color palette
 PROFESSIONAL_COLORS = {
     'risk_high': '#DC143C',      # Crimson
@@ -36,6 +72,193 @@ PROFESSIONAL_COLORS = {
     'success': '#00CED1',        # Dark Turquoise
 }
 
+# Màu đã quy đổi sẵn sang RGBA để matplotlib không phải parse chuỗi hex ở mỗi lần vẽ
+PROFESSIONAL_RGBA = {k: mcolors.to_rgba(v) for k, v in PROFESSIONAL_COLORS.items()}
+
+# Bảng màu cho biểu đồ hoạt động theo giờ: index 0 = giờ thường, 1 = giờ vàng
+_ENGAGEMENT_BAR_RGBA = np.array([PROFESSIONAL_RGBA['neutral'],
+                                 PROFESSIONAL_RGBA['user_engagement']])
+
+def _pareto_mask_numpy(gas_norm: np.ndarray, user_act: np.ndarray) -> np.ndarray:
+    """
+    Đánh dấu các điểm thuộc Pareto frontier (cả hai trục: càng cao càng tốt).
+    
+    Sắp xếp theo gas giảm dần (hòa thì activity giảm dần), sau đó quét một lần:
+    một điểm là tối ưu nếu activity lớn hơn hẳn mọi điểm đứng trước nó.
+    Các điểm trùng nhau hoàn toàn không chi phối lẫn nhau nên dùng chung kết quả.
+    Độ phức tạp O(n log n) thay vì so sánh từng cặp O(n²).
+    """
+    n = len(gas_norm)
+    order = np.lexsort((-user_act, -gas_norm))
+    gas_sorted = gas_norm[order]
+    act_sorted = user_act[order]
+    prev_max = np.empty_like(act_sorted)
+    prev_max[:1] = -np.inf
+    np.maximum.accumulate(act_sorted[:-1], out=prev_max[1:])
+    mask_sorted = act_sorted > prev_max
+    
+    # Điểm trùng với điểm liền trước -> lấy kết quả của điểm đầu tiên trong nhóm
+    is_dup = np.zeros(n, dtype=bool)
+    is_dup[1:] = (gas_sorted[1:] == gas_sorted[:-1]) & (act_sorted[1:] == act_sorted[:-1])
+    run_start = np.maximum.accumulate(np.where(is_dup, 0, np.arange(n)))
+    
+    mask = np.empty(n, dtype=bool)
+    mask[order] = mask_sorted[run_start]
+    return mask
+
+def _pareto_mask_scan(gas_norm, user_act):
+    """
+    Cùng kết quả với _pareto_mask_numpy nhưng viết dạng vòng lặp scalar
+    để Numba biên dịch: không cấp phát mảng trung gian ngoài order/mask.
+    Các điểm cùng mức gas được xử lý theo nhóm; trong nhóm chỉ giữ điểm có
+    activity cao nhất, và chỉ khi nó vượt hẳn mọi nhóm có gas tốt hơn.
+    """
+    n = gas_norm.shape[0]
+    order = np.argsort(-gas_norm, kind='mergesort')
+    mask = np.zeros(n, dtype=np.bool_)
+    running_max = -np.inf
+    i = 0
+    while i < n:
+        g = gas_norm[order[i]]
+        group_max = -np.inf
+        j = i
+        while j < n and gas_norm[order[j]] == g:
+            a = user_act[order[j]]
+            if a > group_max:
+                group_max = a
+            j += 1
+        if group_max > running_max:
+            for k in range(i, j):
+                mask[order[k]] = user_act[order[k]] == group_max
+            running_max = group_max
+        i = j
+    return mask
+
+# Hình học cố định của KPI gauge (nửa vòng tròn nền, bán kính 0.4)
+_GAUGE_RADIUS = 0.4
+_GAUGE_NEEDLE = 0.35
+_GAUGE_THETA = np.linspace(0, np.pi, 100)
+_GAUGE_BG_X = 0.5 + _GAUGE_RADIUS * np.cos(_GAUGE_THETA)
+_GAUGE_BG_Y = 0.5 + _GAUGE_RADIUS * np.sin(_GAUGE_THETA)
+for _arr in (_GAUGE_THETA, _GAUGE_BG_X, _GAUGE_BG_Y):
+    _arr.setflags(write=False)
+
+# Bảng sin/cos theo giờ (chu kỳ 24h) dùng chung cho Pareto frontier và 3D surface
+_HOURS24 = np.arange(24)
+_SIN_H = np.sin(_HOURS24 * np.pi / 12)
+_COS_H = np.cos(_HOURS24 * np.pi / 12)
+for _arr in (_HOURS24, _SIN_H, _COS_H):
+    _arr.setflags(write=False)
+
+def _peak_cos(peak_hour: float) -> np.ndarray:
+    """
+    cos((h - peak)·π/12) cho 24 giờ, theo công thức cộng góc:
+    cos(a - b) = cos a·cos b + sin a·sin b -> chỉ cần 2 phép lượng giác vô hướng.
+    """
+    phase = peak_hour * np.pi / 12
+    return _COS_H * np.cos(phase) + _SIN_H * np.sin(phase)
+
+@lru_cache(maxsize=256)
+def _gauge_filled_arc(value: float) -> Tuple[np.ndarray, np.ndarray, float, float]:
+    """
+    Toạ độ phần cung đã tô và đầu kim cho một giá trị gauge.
+    value nên được làm tròn (3 chữ số) trước khi gọi để cache có hiệu quả.
+    """
+    value_theta = np.pi * (1 - value)
+    filled_theta = np.linspace(value_theta, np.pi, 50)
+    x_filled = 0.5 + _GAUGE_RADIUS * np.cos(filled_theta)
+    y_filled = 0.5 + _GAUGE_RADIUS * np.sin(filled_theta)
+    x_filled.setflags(write=False)
+    y_filled.setflags(write=False)
+    needle_x = 0.5 + _GAUGE_NEEDLE * np.cos(value_theta)
+    needle_y = 0.5 + _GAUGE_NEEDLE * np.sin(value_theta)
+    return x_filled, y_filled, needle_x, needle_y
+
+# Ngưỡng phân loại rủi ro (dùng chung cho gauge, recommendation và insights)
+RISK_THRESHOLDS = (0.4, 0.75)
+_RECOMMENDATIONS = ("PROCEED - LOW RISK", "REVIEW - MEDIUM RISK", "STOP - HIGH RISK")
+
+def _dashboard_metrics_numpy(risk_scores, internal_scores, dep_counts,
+                             gas_gweis, gas_hours, peak_hours):
+    """Phiên bản NumPy (vector hóa) của _dashboard_metrics_scan."""
+    internal_contrib = internal_scores * 0.4
+    dependency_contrib = np.minimum(dep_counts, 5) / 5.0 * 0.6
+    risk_band = np.searchsorted(np.array(RISK_THRESHOLDS), risk_scores, side='right').astype(np.int8)
+    gas_normalized = np.minimum(gas_gweis / 100.0, 1.0)
+    activity_normalized = peak_hours / 24.0
+    hour_gap = np.abs(gas_hours - peak_hours) % 24
+    hour_gap = np.minimum(hour_gap, 24 - hour_gap)  # khoảng cách theo vòng 24h
+    return internal_contrib, dependency_contrib, risk_band, gas_normalized, activity_normalized, hour_gap
+
+def _dashboard_metrics_scan(risk_scores, internal_scores, dep_counts,
+                            gas_gweis, gas_hours, peak_hours):
+    """
+    Tính các chỉ số số học của Executive Dashboard cho n hợp đồng cùng lúc
+    (mỗi phần tử độc lập -> Numba chia vòng lặp qua prange).
+    """
+    n = risk_scores.shape[0]
+    internal_contrib = np.empty(n)
+    dependency_contrib = np.empty(n)
+    risk_band = np.empty(n, dtype=np.int8)
+    gas_normalized = np.empty(n)
+    activity_normalized = np.empty(n)
+    hour_gap = np.empty(n, dtype=np.int64)
+    low, high = RISK_THRESHOLDS
+    for i in prange(n):
+        internal_contrib[i] = internal_scores[i] * 0.4
+        dependency_contrib[i] = min(dep_counts[i], 5) / 5.0 * 0.6
+        r = risk_scores[i]
+        if r < low:
+            risk_band[i] = 0
+        elif r < high:
+            risk_band[i] = 1
+        else:
+            risk_band[i] = 2
+        gas_normalized[i] = min(gas_gweis[i] / 100.0, 1.0)
+        activity_normalized[i] = peak_hours[i] / 24.0
+        gap = abs(gas_hours[i] - peak_hours[i]) % 24
+        hour_gap[i] = min(gap, 24 - gap)
+    return internal_contrib, dependency_contrib, risk_band, gas_normalized, activity_normalized, hour_gap
+
+_dashboard_metrics_kernel = (numba.njit(parallel=True, cache=True)(_dashboard_metrics_scan)
+                             if numba is not None else _dashboard_metrics_numpy)
+# Lô nhỏ hơn ngưỡng này (vd. 1 dashboard) dùng NumPy: nạp/biên dịch kernel Numba (~1s ở lần gọi đầu)
+# đắt hơn nhiều so với vài phép tính số thực
+DASHBOARD_NUMBA_MIN_BATCH = 1024
+
+def compute_dashboard_metrics(risk_scores, internal_scores, dep_counts,
+                              gas_gweis, gas_hours, peak_hours) -> Dict[str, np.ndarray]:
+    """
+    Tính trước các chỉ số cho một lô Executive Dashboard (dạng struct-of-arrays).
+    
+    Args:
+        risk_scores: final_risk_score của từng hợp đồng (0-1)
+        internal_scores: internal risk score đã chia 100 (0-1)
+        dep_counts: Số rủi ro phụ thuộc
+        gas_gweis: estimated_avg_gwei
+        gas_hours: Giờ (UTC) của cửa sổ gas tối ưu
+        peak_hours: Giờ (UTC) user hoạt động mạnh nhất
+        
+    Returns:
+        Dictionary tên chỉ số -> mảng độ dài n
+    """
+    kernel = (_dashboard_metrics_kernel if len(risk_scores) >= DASHBOARD_NUMBA_MIN_BATCH
+              else _dashboard_metrics_numpy)
+    arrays = kernel(
+        np.asarray(risk_scores, dtype=np.float64),
+        np.asarray(internal_scores, dtype=np.float64),
+        np.asarray(dep_counts, dtype=np.int64),
+        np.asarray(gas_gweis, dtype=np.float64),
+        np.asarray(gas_hours, dtype=np.int64),
+        np.asarray(peak_hours, dtype=np.int64),
+    )
+    keys = ('internal_contrib', 'dependency_contrib', 'risk_band',
+            'gas_normalized', 'activity_normalized', 'hour_gap')
+    return dict(zip(keys, arrays))
+
+# Không dùng fastmath: thuật toán so sánh với -inf
+_pareto_mask = numba.njit(cache=True)(_pareto_mask_scan) if numba is not None else _pareto_mask_numpy
+
 # Thiết lập professional style
 plt.style.use('seaborn-v0_8-whitegrid')
 sns.set_palette("Set2")
@@ -46,14 +269,122 @@ class AdvancedVisualizationService:
     được thiết kế cho on-chain data analysis.
     """
     
-    def __init__(self, output_dir: str = "data/visualizations"):
+    # Formatter trục thời gian dùng chung (DateFormatter không phụ thuộc axis khi format)
+    _DATE_FMT = mdates.DateFormatter('%m/%d\n%H:00')
+    
+    # Nền Risk Matrix 5x5 (chỉ đọc, dùng chung cho mọi lần vẽ)
+    _RISK_BG = np.zeros((5, 5))
+    _RISK_BG.flags.writeable = False
+    
+    def __init__(self, output_dir: str = "data/visualizations", dpi: int = 150,
+                 post_compress: bool = True, antialiased: bool = False):
+        """
+        Args:
+            output_dir: Thư mục lưu các file hình ảnh
+            dpi: Độ phân giải khi lưu PNG (150 đủ cho báo cáo, encode nhanh hơn ~2x so với 300)
+            post_compress: Nén lại PNG bằng pngquant sau khi lưu (nếu pngquant có trong PATH)
+            antialiased: Bật khử răng cưa cho line/patch (tắt mặc định để Agg rasterize nhanh hơn;
+                         chữ vẫn luôn được khử răng cưa)
+        """
         self.output_dir = Path(output_dir)
+        self.dpi = dpi
+        self.post_compress = post_compress
+        self._dashboard_fig = None
+        self._dashboard_lock = threading.Lock()
+        # File PNG đang ghi trên _IO_EXECUTOR: figure được giải phóng ngay sau khi encode
+        self._pending_writes: List[Future] = []
+        self._pending_lock = threading.Lock()
         self.output_dir.mkdir(parents=True, exist_ok=True)
         (self.output_dir / "advanced").mkdir(exist_ok=True)
         (self.output_dir / "executive").mkdir(exist_ok=True)
+        
+        # rcParams riêng của service, chỉ áp dụng trong lúc vẽ/lưu (xem _with_rc), không đổi
+        # plt.rcParams toàn cục của các biểu đồ khác (vd. VisualizationService)
+        self._rc = {
+            # Đơn giản hóa path khi rasterize (giảm số đỉnh cần vẽ trên canvas lớn)
+            "path.simplify": True,
+            "path.simplify_threshold": 1.0,
+            "agg.path.chunksize": 20000,
+            "lines.antialiased": antialiased,
+            "patch.antialiased": antialiased,
+            "savefig.pad_inches": 0.05,
+        }
+    
+    def _save_figure(self, fig: Figure, file_path: Path, **savefig_kw):
+        """
+        Encode figure ra PNG (theo self.dpi) vào bộ nhớ, rồi giao việc ghi đĩa
+        (và nén pngquant nếu có) cho thread I/O. Hàm trả về ngay sau khi encode,
+        nên figure có thể được clf()/dùng lại trong lúc file đang được ghi.
+        Gọi wait_for_writes() nếu cần chắc chắn file đã có trên đĩa.
+        """
+        buf = io.BytesIO()
+        fig.savefig(buf, format='png', dpi=self.dpi, bbox_inches='tight',
+                    pil_kwargs={'compress_level': 6}, **savefig_kw)
+        file_path = Path(file_path)
+        future = _IO_EXECUTOR.submit(self._write_png, file_path, buf.getvalue())
+        future.file_path = file_path
+        # Lỗi ghi file được ghi log ngay khi xảy ra, kể cả khi không ai gọi wait_for_writes()
+        future.add_done_callback(self._log_write_error)
+        with self._pending_lock:
+            self._pending_writes = [f for f in self._pending_writes if not f.done()]
+            self._pending_writes.append(future)
+    
+    def _write_png(self, file_path: Path, data: bytes):
+        """Ghi PNG ra đĩa, sau đó nén lại bằng pngquant nếu có (chạy trên thread I/O)."""
+        file_path.write_bytes(data)
+        if self.post_compress and shutil.which('pngquant'):
+            subprocess.run(['pngquant', '--speed', '4', '--force', '--skip-if-larger',
+                            '--output', str(file_path), str(file_path)],
+                           capture_output=True)
+    
+    @staticmethod
+    def _log_write_error(future: Future):
+        """Callback của các lần ghi PNG: ghi log lỗi (nếu có)."""
+        error = future.exception()
+        if error is not None:
+            logger.error("[Advanced Viz] Lỗi khi ghi file %s: %s", future.file_path, error)
     
+    def wait_for_writes(self) -> List[str]:
+        """
+        Chờ tất cả các file PNG đang ghi ở background hoàn tất.
+        
+        Returns:
+            Danh sách đường dẫn các file ghi thất bại (lỗi đã được ghi log)
+        """
+        with self._pending_lock:
+            pending, self._pending_writes = self._pending_writes, []
+        wait(pending)
+        return [str(f.file_path) for f in pending if f.exception() is not None]
+    
+    def _new_figure(self, save: bool, **fig_kw) -> Figure:
+        """
+        Tạo Figure mới.
+        - save=True: Figure gắn trực tiếp với canvas Agg, không đi qua pyplot
+          (không khởi tạo GUI backend, không giữ global state).
+        - save=False: dùng pyplot để còn hiển thị bằng plt.show().
+        """
+        if not save:
+            return plt.figure(**fig_kw)
+        fig = Figure(**fig_kw)
+        FigureCanvasAgg(fig)
+        return fig
+    
+    def prepare_dashboard_features(self, results: Dict) -> Dict:
+        """
+        Trích một lần các giá trị dashboard cần từ results (best window đã parse +
+        hàng chỉ số của compute_dashboard_metrics). Truyền lại vào
+        create_executive_dashboard(features=...) để các lần vẽ sau không phải tính lại.
+        """
+        best_time = self._parse_best_window(results.get('pillar2_gas', {}))
+        return {
+            'best_time': best_time,
+            'metrics': self._dashboard_metrics(results, best_time),
+        }
+    
+    @_with_rc
     def create_executive_dashboard(self, results: Dict, contract_address: str, 
-                                   campaign_start_date: str, save: bool = True) -> str:
+                                   campaign_start_date: str, save: bool = True,
+                                   features: Optional[Dict] = None) -> str:
         """
         Tạo Executive Dashboard - Tổng hợp tất cả insights trong 1 trang.
         Đây là biểu đồ quan trọng nhất cho stakeholders và decision-makers.
@@ -64,8 +395,99 @@ class AdvancedVisualizationService:
         - Middle Right: Gas Forecast với Best Window (P2)
         - Bottom Left: User Engagement (P3)
         - Bottom Right: Strategic Recommendations
+        
+        features: kết quả của prepare_dashboard_features(results) nếu đã tính sẵn
+        """
+        if features is None:
+            features = self.prepare_dashboard_features(results)
+        
+        if not save:
+            fig = self._new_figure(False, figsize=(20, 12))
+            self._draw_executive_dashboard(fig, results, contract_address, **features)
+            plt.show()
+            return ""
+        
+        # Figure dùng lại giữa các lần gọi -> khóa để 2 thread không vẽ chồng lên nhau
+        with self._dashboard_lock:
+            fig = self._get_dashboard_figure()
+            self._draw_executive_dashboard(fig, results, contract_address, **features)
+            
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            file_path = self.output_dir / "executive" / f"executive_dashboard_{timestamp}.png"
+            self._save_figure(fig, file_path, facecolor='white')
+        print(f"[Advanced Viz] Đã lưu Executive Dashboard: {file_path}")
+        return str(file_path)
+    
+    @_with_rc
+    def create_executive_dashboards(self, results_list: List[Dict], contract_addresses: List[str],
+                                    campaign_start_date: str) -> List[str]:
+        """
+        Tạo Executive Dashboard cho nhiều hợp đồng.
+        Các chỉ số số học được tính một lần cho cả lô (compute_dashboard_metrics),
+        sau đó từng dashboard chỉ đọc hàng i tương ứng khi vẽ.
+        
+        Returns:
+            Danh sách đường dẫn file dashboard đã tạo (cùng thứ tự với results_list)
+        """
+        best_times = [self._parse_best_window(r.get('pillar2_gas', {})) for r in results_list]
+        batch = compute_dashboard_metrics(*zip(*(self._dashboard_inputs(r, t)
+                                                 for r, t in zip(results_list, best_times))))
+        
+        paths = []
+        for i, (results, contract_address) in enumerate(zip(results_list, contract_addresses)):
+            metrics = {key: values[i] for key, values in batch.items()}
+            with self._dashboard_lock:
+                fig = self._get_dashboard_figure()
+                self._draw_executive_dashboard(fig, results, contract_address,
+                                               metrics=metrics, best_time=best_times[i])
+                safe_address = contract_address.lower().replace("0x", "")
+                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+                file_path = self.output_dir / "executive" / f"executive_dashboard_{safe_address}_{timestamp}.png"
+                self._save_figure(fig, file_path, facecolor='white')
+            print(f"[Advanced Viz] Đã lưu Executive Dashboard: {file_path}")
+            paths.append(str(file_path))
+        self.wait_for_writes()
+        return paths
+    
+    @staticmethod
+    def _dashboard_inputs(results: Dict, best_time: Optional[pd.Timestamp]) -> Tuple:
+        """Trích các giá trị đầu vào của compute_dashboard_metrics từ một results dict."""
+        p1 = results.get('pillar1_risk', {})
+        p2 = results.get('pillar2_gas', {})
+        p3 = results.get('pillar3_user', {})
+        return (
+            p1.get('final_risk_score', 0),
+            p1.get('internal_risk', {}).get('score', 0) / 100.0,
+            len(p1.get('dependency_risks', [])),
+            p2.get('estimated_avg_gwei', 0),
+            best_time.hour if best_time is not None else 12,
+            p3.get('peak_activity_hour', 14),
+        )
+    
+    def _dashboard_metrics(self, results: Dict, best_time: Optional[pd.Timestamp] = None) -> Dict:
+        """Chỉ số dashboard cho một results dict (lô 1 phần tử)."""
+        batch = compute_dashboard_metrics(*([v] for v in self._dashboard_inputs(results, best_time)))
+        return {key: values[0] for key, values in batch.items()}
+    
+    def _get_dashboard_figure(self) -> Figure:
+        """
+        Trả về Figure (Agg) dùng chung cho Executive Dashboard.
+        Lần đầu tạo mới, các lần sau chỉ clf() thay vì dựng lại Figure/canvas.
+        Phải gọi khi đang giữ self._dashboard_lock.
+        """
+        if self._dashboard_fig is None:
+            self._dashboard_fig = self._new_figure(True, figsize=(20, 12))
+        else:
+            self._dashboard_fig.clf()
+        return self._dashboard_fig
+    
+    def _draw_executive_dashboard(self, fig: Figure, results: Dict, contract_address: str,
+                                  metrics: Optional[Dict] = None,
+                                  best_time: Optional[pd.Timestamp] = None):
+        """
+        Vẽ toàn bộ nội dung Executive Dashboard lên fig (fig đã rỗng).
+        metrics: hàng chỉ số đã tính sẵn bởi compute_dashboard_metrics (None -> tự tính).
         """
-        fig = plt.figure(figsize=(20, 12))
         fig.suptitle('EXECUTIVE DASHBOARD - Web3 Campaign Strategy Analysis', 
                     fontsize=24, fontweight='bold', y=0.98)
         
@@ -78,11 +500,17 @@ class AdvancedVisualizationService:
         p2 = results.get('pillar2_gas', {})
         p3 = results.get('pillar3_user', {})
         
+        # Parse best window một lần, dùng chung cho timeline và insights
+        if best_time is None:
+            best_time = self._parse_best_window(p2)
+        if metrics is None:
+            metrics = self._dashboard_metrics(results, best_time)
+        
         # KPI 1: Risk Score
         ax_kpi1 = fig.add_subplot(gs[0, 0])
         risk_score = p1.get('final_risk_score', 0)
         self._draw_kpi_gauge(ax_kpi1, risk_score, 'RISK SCORE', 
-                             thresholds=[0.4, 0.75], 
+                             thresholds=RISK_THRESHOLDS, 
                              colors=['green', 'orange', 'red'])
         
         # KPI 2: Gas Cost Optimization
@@ -99,50 +527,40 @@ class AdvancedVisualizationService:
         
         # KPI 4: Overall Recommendation
         ax_kpi4 = fig.add_subplot(gs[0, 3])
-        recommendation = self._calculate_overall_recommendation(results)
+        recommendation = self._calculate_overall_recommendation(results, metrics['risk_band'])
         self._draw_recommendation_card(ax_kpi4, recommendation)
         
         # === MIDDLE LEFT: Risk Analysis Breakdown ===
         ax_risk = fig.add_subplot(gs[1, 0])
-        self._draw_risk_waterfall(ax_risk, p1)
+        self._draw_risk_waterfall(ax_risk, p1, metrics)
         
         # === MIDDLE: Gas Forecast Timeline ===
         ax_gas = fig.add_subplot(gs[1, 1:3])
-        self._draw_gas_forecast_timeline(ax_gas, p2)
+        self._draw_gas_forecast_timeline(ax_gas, p2, best_time)
         
         # === MIDDLE RIGHT: Dependency Network (Simplified) ===
         ax_network = fig.add_subplot(gs[1, 3])
         self._draw_dependency_network(ax_network, p1, contract_address)
         
         # === BOTTOM LEFT: User Engagement Analysis ===
-        ax_user = fig.add_subplot(gs[2, 0:2])
-        self._draw_user_engagement_analysis(ax_user, p3)
+        self._draw_user_engagement_analysis(gs[2, 0:2], fig, p3)
         
         # === BOTTOM MIDDLE: Cost-Benefit Matrix ===
         ax_costbenefit = fig.add_subplot(gs[2, 2])
-        self._draw_cost_benefit_matrix(ax_costbenefit, p2, p3)
+        self._draw_cost_benefit_matrix(ax_costbenefit, p2, p3, metrics)
         
         # === BOTTOM RIGHT: Strategic Insights ===
         ax_insights = fig.add_subplot(gs[2, 3])
-        self._draw_strategic_insights(ax_insights, results, contract_address)
-        
-        if save:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            file_path = self.output_dir / "executive" / f"executive_dashboard_{timestamp}.png"
-            plt.savefig(file_path, dpi=300, bbox_inches='tight', facecolor='white')
-            print(f"[Advanced Viz] Đã lưu Executive Dashboard: {file_path}")
-            plt.close()
-            return str(file_path)
-        else:
-            plt.show()
-            return ""
+        self._draw_strategic_insights(ax_insights, results, contract_address, best_time, metrics)
     
+    @_with_rc
     def create_tradeoff_analysis(self, results: Dict, save: bool = True) -> str:
         """
         Visualize Trade-off Analysis giữa Gas Cost vs User Engagement.
         Sử dụng Pareto Frontier để tìm optimal points.
         """
-        fig, axes = plt.subplots(1, 2, figsize=(16, 7))
+        fig = self._new_figure(save, figsize=(16, 7))
+        axes = fig.subplots(1, 2)
         
         p2 = results.get('pillar2_gas', {})
         p3 = results.get('pillar3_user', {})
@@ -155,27 +573,28 @@ class AdvancedVisualizationService:
         ax2 = axes[1]
         self._draw_3d_tradeoff_surface(ax2, p2, p3)
         
-        plt.suptitle('Trade-off Analysis: Gas Cost vs User Engagement', 
+        fig.suptitle('Trade-off Analysis: Gas Cost vs User Engagement', 
                     fontsize=18, fontweight='bold', y=0.98)
-        plt.tight_layout()
+        fig.tight_layout()
         
         if save:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             file_path = self.output_dir / "advanced" / f"tradeoff_analysis_{timestamp}.png"
-            plt.savefig(file_path, dpi=300, bbox_inches='tight')
+            self._save_figure(fig, file_path)
             print(f"[Advanced Viz] Đã lưu Trade-off Analysis: {file_path}")
-            plt.close()
             return str(file_path)
         else:
             plt.show()
             return ""
     
+    @_with_rc
     def create_risk_heatmap(self, risk_data: Dict, contract_address: str, 
                            save: bool = True) -> str:
         """
         Tạo Risk Heatmap - Hiển thị risk levels theo các dimensions khác nhau.
         """
-        fig, axes = plt.subplots(1, 2, figsize=(16, 6))
+        fig = self._new_figure(save, figsize=(16, 6))
+        axes = fig.subplots(1, 2)
         
         # Left: Risk Matrix (Severity vs Likelihood)
         ax1 = axes[0]
@@ -185,17 +604,16 @@ class AdvancedVisualizationService:
         ax2 = axes[1]
         self._draw_risk_timeline(ax2, risk_data)
         
-        plt.suptitle(f'Risk Heatmap Analysis - {contract_address[:10]}...', 
+        fig.suptitle(f'Risk Heatmap Analysis - {contract_address[:10]}...', 
                     fontsize=18, fontweight='bold')
-        plt.tight_layout()
+        fig.tight_layout()
         
         if save:
             safe_address = contract_address.lower().replace("0x", "")
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             file_path = self.output_dir / "advanced" / f"risk_heatmap_{safe_address}_{timestamp}.png"
-            plt.savefig(file_path, dpi=300, bbox_inches='tight')
+            self._save_figure(fig, file_path)
             print(f"[Advanced Viz] Đã lưu Risk Heatmap: {file_path}")
-            plt.close()
             return str(file_path)
         else:
             plt.show()
@@ -203,6 +621,18 @@ class AdvancedVisualizationService:
     
     # ========== Helper Methods ==========
     
+    @staticmethod
+    def _parse_best_window(gas_data: Dict) -> Optional[pd.Timestamp]:
+        """Parse 'best_window_start_utc' thành Timestamp (None nếu thiếu hoặc lỗi)."""
+        best_window = gas_data.get('best_window_start_utc')
+        if not best_window:
+            return None
+        try:
+            best_time = pd.to_datetime(best_window)
+        except (ValueError, TypeError):
+            return None
+        return None if pd.isna(best_time) else best_time
+    
     def _draw_kpi_gauge(self, ax, value: float, title: str, 
                        thresholds: List[float], colors: List[str]):
         """Vẽ KPI Gauge Chart (Speedometer style)."""
@@ -210,10 +640,6 @@ class AdvancedVisualizationService:
         ax.set_ylim([0, 1])
         ax.axis('off')
         
-        # Vẽ gauge
-        theta = np.linspace(0, np.pi, 100)
-        r = 0.4
-        
         # Xác định màu dựa trên giá trị
         if value < thresholds[0]:
             color = colors[0]
@@ -222,28 +648,16 @@ class AdvancedVisualizationService:
         else:
             color = colors[2]
         
-        # Vẽ nửa vòng tròn
-        x_gauge = 0.5 + r * np.cos(theta)
-        y_gauge = 0.5 + r * np.sin(theta)
-        
-        # Vẽ background
-        ax.plot(x_gauge, y_gauge, color='lightgray', linewidth=20, alpha=0.3)
+        # Vẽ background (nửa vòng tròn, toạ độ tính sẵn ở module)
+        ax.plot(_GAUGE_BG_X, _GAUGE_BG_Y, color='lightgray', linewidth=20, alpha=0.3)
         
         # Vẽ filled portion
-        value_theta = np.pi * (1 - value)
-        filled_theta = np.linspace(value_theta, np.pi, 50)
-        x_filled = 0.5 + r * np.cos(filled_theta)
-        y_filled = 0.5 + r * np.sin(filled_theta)
+        x_filled, y_filled, needle_x, needle_y = _gauge_filled_arc(round(float(value), 3))
         ax.plot(x_filled, y_filled, color=color, linewidth=20, alpha=0.8)
         
         # Vẽ needle
-        needle_theta = np.pi * (1 - value)
-        ax.plot([0.5, 0.5 + 0.35 * np.cos(needle_theta)], 
-               [0.5, 0.5 + 0.35 * np.sin(needle_theta)],
-               color='black', linewidth=3)
-        ax.plot(0.5 + 0.35 * np.cos(needle_theta), 
-               0.5 + 0.35 * np.sin(needle_theta),
-               'o', color='black', markersize=8)
+        ax.plot([0.5, needle_x], [0.5, needle_y], color='black', linewidth=3)
+        ax.plot(needle_x, needle_y, 'o', color='black', markersize=8)
         
         # Hiển thị giá trị
         ax.text(0.5, 0.25, f'{value:.3f}', ha='center', va='center',
@@ -264,7 +678,7 @@ class AdvancedVisualizationService:
         # Background box
         box = FancyBboxPatch((0.05, 0.05), 0.9, 0.9,
                              boxstyle="round,pad=0.02",
-                             facecolor=PROFESSIONAL_COLORS.get(color_key, 'lightblue'),
+                             facecolor=PROFESSIONAL_RGBA.get(color_key, 'lightblue'),
                              edgecolor='black', linewidth=2, alpha=0.3)
         ax.add_patch(box)
         
@@ -284,11 +698,11 @@ class AdvancedVisualizationService:
         
         # Xác định màu dựa trên recommendation
         if 'PROCEED' in recommendation.upper():
-            color = PROFESSIONAL_COLORS['success']
+            color = PROFESSIONAL_RGBA['success']
         elif 'WAIT' in recommendation.upper() or 'REVIEW' in recommendation.upper():
-            color = PROFESSIONAL_COLORS['risk_medium']
+            color = PROFESSIONAL_RGBA['risk_medium']
         else:
-            color = PROFESSIONAL_COLORS['risk_high']
+            color = PROFESSIONAL_RGBA['risk_high']
         
         box = FancyBboxPatch((0.05, 0.05), 0.9, 0.9,
                              boxstyle="round,pad=0.02",
@@ -299,32 +713,21 @@ class AdvancedVisualizationService:
         ax.text(0.5, 0.7, 'RECOMMENDATION', ha='center', va='center',
                fontsize=12, fontweight='bold')
         
-        # Wrap text
-        words = recommendation.split()
-        lines = []
-        current_line = []
-        for word in words:
-            if len(' '.join(current_line + [word])) < 25:
-                current_line.append(word)
-            else:
-                lines.append(' '.join(current_line))
-                current_line = [word]
-        if current_line:
-            lines.append(' '.join(current_line))
+        # Wrap text (mỗi dòng < 25 ký tự, tối đa 3 dòng)
+        lines = textwrap.wrap(recommendation, width=24, break_long_words=False)
         
-        for i, line in enumerate(lines[:3]):  # Tối đa 3 dòng
+        for i, line in enumerate(lines[:3]):
             ax.text(0.5, 0.5 - i*0.15, line, ha='center', va='center',
                    fontsize=11, fontweight='bold')
     
-    def _draw_risk_waterfall(self, ax, risk_data: Dict):
+    def _draw_risk_waterfall(self, ax, risk_data: Dict, metrics: Optional[Dict] = None):
         """Vẽ Waterfall Chart cho Risk Breakdown."""
-        internal_score = risk_data.get('internal_risk', {}).get('score', 0) / 100.0
-        dependency_count = len(risk_data.get('dependency_risks', []))
-        dependency_score = min(dependency_count, 5) / 5.0
+        if metrics is None:
+            metrics = self._dashboard_metrics({'pillar1_risk': risk_data})
         
         final_score = risk_data.get('final_risk_score', 0)
-        internal_contrib = internal_score * 0.4
-        dependency_contrib = dependency_score * 0.6
+        internal_contrib = float(metrics['internal_contrib'])
+        dependency_contrib = float(metrics['dependency_contrib'])
         
         categories = ['Base', 'Internal\nRisk\n(0.4x)', 'Dependency\nRisk\n(0.6x)', 'Final']
         values = [0, internal_contrib, dependency_contrib, final_score]
@@ -363,7 +766,8 @@ class AdvancedVisualizationService:
         ax.set_ylim([0, 1])
         ax.grid(axis='y', alpha=0.3)
     
-    def _draw_gas_forecast_timeline(self, ax, gas_data: Dict):
+    def _draw_gas_forecast_timeline(self, ax, gas_data: Dict,
+                                    best_time: Optional[pd.Timestamp] = None):
         """Vẽ Gas Forecast Timeline với annotations."""
         forecast_df = gas_data.get('forecast_dataframe')
         if forecast_df is None or forecast_df.empty:
@@ -372,11 +776,15 @@ class AdvancedVisualizationService:
             ax.set_title('Gas Forecast Timeline', fontsize=12, fontweight='bold')
             return
         
-        forecast_df.index = pd.to_datetime(forecast_df.index)
+        if not isinstance(forecast_df.index, pd.DatetimeIndex):
+            forecast_df.index = pd.to_datetime(forecast_df.index)
+        
+        gas_color = PROFESSIONAL_RGBA['gas_cost']
+        highlight = PROFESSIONAL_RGBA['highlight']
         
         # Plot forecast
         ax.plot(forecast_df.index, forecast_df['predicted_gwei'], 
-               linewidth=3, color=PROFESSIONAL_COLORS['gas_cost'], 
+               linewidth=3, color=gas_color, 
                label='Predicted Gas Price', zorder=3)
         
         # Confidence interval
@@ -384,22 +792,22 @@ class AdvancedVisualizationService:
             ax.fill_between(forecast_df.index,
                           forecast_df['lower predicted_gwei'],
                           forecast_df['upper predicted_gwei'],
-                          alpha=0.2, color=PROFESSIONAL_COLORS['gas_cost'],
+                          alpha=0.2, color=gas_color,
                           label='95% Confidence Interval')
         
         # Highlight best window
-        best_window = gas_data.get('best_window_start_utc')
-        if best_window:
+        if best_time is None:
+            best_time = self._parse_best_window(gas_data)
+        if best_time is not None:
             try:
-                best_time = pd.to_datetime(best_window)
                 best_gas = gas_data.get('estimated_avg_gwei', 0)
                 
-                ax.axvline(x=best_time, color=PROFESSIONAL_COLORS['highlight'], 
+                ax.axvline(x=best_time, color=highlight, 
                           linestyle='--', linewidth=3, alpha=0.7,
                           label=f'Optimal Window: {best_time.strftime("%m/%d %H:00")}')
                 
                 ax.scatter([best_time], [best_gas], 
-                          color=PROFESSIONAL_COLORS['highlight'], s=300, 
+                          color=highlight, s=300, 
                           zorder=5, marker='*', edgecolors='black', linewidths=2)
                 
                 # Annotation
@@ -407,7 +815,7 @@ class AdvancedVisualizationService:
                           xy=(best_time, best_gas),
                           xytext=(10, 30), textcoords='offset points',
                           bbox=dict(boxstyle='round,pad=0.5', 
-                                  facecolor=PROFESSIONAL_COLORS['highlight'], 
+                                  facecolor=highlight, 
                                   alpha=0.8),
                           arrowprops=dict(arrowstyle='->', connectionstyle='arc3,rad=0'),
                           fontsize=11, fontweight='bold')
@@ -420,7 +828,7 @@ class AdvancedVisualizationService:
                     fontsize=12, fontweight='bold')
         ax.legend(loc='best', fontsize=9)
         ax.grid(True, alpha=0.3)
-        ax.xaxis.set_major_formatter(mdates.DateFormatter('%m/%d\n%H:00'))
+        ax.xaxis.set_major_formatter(self._DATE_FMT)
         plt.setp(ax.xaxis.get_majorticklabels(), rotation=0, ha='center')
     
     def _draw_dependency_network(self, ax, risk_data: Dict, contract_address: str):
@@ -435,56 +843,61 @@ class AdvancedVisualizationService:
         # Central node (main contract)
         center_x, center_y = 0.5, 0.5
         main_node = plt.Circle((center_x, center_y), 0.08, 
-                              color=PROFESSIONAL_COLORS['risk_medium'], 
+                              color=PROFESSIONAL_RGBA['risk_medium'], 
                               alpha=0.7, edgecolor='black', linewidth=2)
         ax.add_patch(main_node)
         ax.text(center_x, center_y - 0.15, 'Main Contract', 
                ha='center', fontsize=9, fontweight='bold')
         
-        # Dependency nodes
+        # Dependency nodes: gom toàn bộ node/edge vào 2 collection (1 artist mỗi loại)
         if nodes:
             n = len(nodes)
-            angles = np.linspace(0, 2*np.pi, n, endpoint=False)
+            angles = np.linspace(0, 2*np.pi, n, endpoint=False)[:n - 1]
             radius = 0.3
+            xs = center_x + radius * np.cos(angles)
+            ys = center_y + radius * np.sin(angles)
             
-            for i, (node, angle) in enumerate(zip(nodes[1:], angles)):
-                x = center_x + radius * np.cos(angle)
-                y = center_y + radius * np.sin(angle)
-                
-                # Màu dựa trên risk
-                color = PROFESSIONAL_COLORS['risk_high'] if i < len(dependency_risks) else PROFESSIONAL_COLORS['success']
-                
-                dep_node = plt.Circle((x, y), 0.05, color=color, 
-                                     alpha=0.7, edgecolor='black', linewidth=1.5)
-                ax.add_patch(dep_node)
-                
-                # Edge
-                ax.plot([center_x, x], [center_y, y], 
-                       color='gray', linewidth=1, alpha=0.5, linestyle='--')
+            # Màu dựa trên risk
+            n_risky = len(dependency_risks)
+            node_colors = np.where((np.arange(len(angles)) < n_risky)[:, None],
+                                   PROFESSIONAL_RGBA['risk_high'], PROFESSIONAL_RGBA['success'])
+            
+            # Edges
+            segments = np.empty((len(angles), 2, 2))
+            segments[:, 0, 0] = center_x
+            segments[:, 0, 1] = center_y
+            segments[:, 1, 0] = xs
+            segments[:, 1, 1] = ys
+            ax.add_collection(LineCollection(segments, colors='gray', linewidths=1,
+                                             linestyles='--', alpha=0.5))
+            
+            circles = [Circle((x, y), 0.05) for x, y in zip(xs, ys)]
+            ax.add_collection(PatchCollection(circles, facecolors=node_colors,
+                                              edgecolors='black', linewidths=1.5, alpha=0.7))
         
         ax.set_title(f'Dependency Network\n({len(nodes)-1} dependencies)', 
                     fontsize=11, fontweight='bold')
     
-    def _draw_user_engagement_analysis(self, ax, user_data: Dict):
-        """Vẽ User Engagement Analysis với multiple metrics."""
+    def _draw_user_engagement_analysis(self, gs_slot, fig: Figure, user_data: Dict):
+        """
+        Vẽ User Engagement Analysis với multiple metrics.
+        gs_slot là SubplotSpec của ô dashboard; 2 axes con được tạo trực tiếp từ đó.
+        """
         peak_hour = user_data.get('peak_activity_hour', 14)
         sybil_clusters = user_data.get('sybil_analysis', {}).get('total_clusters', 0)
         cohort_df = user_data.get('cohort_analysis', pd.DataFrame())
         
-        # Tạo subplots trong axes này
-        gs_sub = ax.get_gridspec().subgridspec(1, 2, hspace=0.3, wspace=0.3)
-        ax.remove()
+        # Tạo 2 subplots trong ô này
+        gs_sub = gs_slot.subgridspec(1, 2, wspace=0.3)
         
         # Left: Peak Activity
-        ax1 = plt.subplot(gs_sub[0, 0])
-        hours = list(range(24))
-        activity = [100 if h == peak_hour else np.random.randint(20, 60) for h in hours]
+        ax1 = fig.add_subplot(gs_sub[0, 0])
+        hours = np.arange(24)
+        activity = np.random.default_rng().integers(20, 60, size=24)
         activity[peak_hour] = 100
+        bar_colors = _ENGAGEMENT_BAR_RGBA[(hours == peak_hour).astype(np.intp)]
         
-        ax1.bar(hours, activity, 
-               color=[PROFESSIONAL_COLORS['user_engagement'] if h == peak_hour 
-                     else PROFESSIONAL_COLORS['neutral'] for h in hours],
-               alpha=0.8, edgecolor='black')
+        ax1.bar(hours, activity, color=bar_colors, alpha=0.8, edgecolor='black')
         ax1.set_xlabel('Hour (UTC)', fontsize=10)
         ax1.set_ylabel('Activity Level', fontsize=10)
         ax1.set_title(f'Peak Activity: {peak_hour}:00 UTC', fontsize=11, fontweight='bold')
@@ -492,11 +905,11 @@ class AdvancedVisualizationService:
         ax1.grid(axis='y', alpha=0.3)
         
         # Right: Cohort Retention
-        ax2 = plt.subplot(gs_sub[0, 1])
+        ax2 = fig.add_subplot(gs_sub[0, 1])
         if cohort_df is not None and not cohort_df.empty:
             retention_d7 = cohort_df.get('day_7_retained', 0) / cohort_df.get('cohort_size', 1) * 100
             ax2.bar(range(len(retention_d7)), retention_d7, 
-                   color=PROFESSIONAL_COLORS['success'], alpha=0.8, edgecolor='black')
+                   color=PROFESSIONAL_RGBA['success'], alpha=0.8, edgecolor='black')
             ax2.set_xlabel('Cohort', fontsize=10)
             ax2.set_ylabel('Day 7 Retention (%)', fontsize=10)
             ax2.set_title('Cohort Retention Analysis', fontsize=11, fontweight='bold')
@@ -506,15 +919,18 @@ class AdvancedVisualizationService:
                     transform=ax2.transAxes, fontsize=12)
             ax2.set_title('Cohort Retention Analysis', fontsize=11, fontweight='bold')
     
-    def _draw_cost_benefit_matrix(self, ax, gas_data: Dict, user_data: Dict):
+    def _draw_cost_benefit_matrix(self, ax, gas_data: Dict, user_data: Dict,
+                                  metrics: Optional[Dict] = None):
         """Vẽ Cost-Benefit Matrix."""
         estimated_gas = gas_data.get('estimated_avg_gwei', 0)
         peak_hour = user_data.get('peak_activity_hour', 14)
+        if metrics is None:
+            metrics = self._dashboard_metrics({'pillar2_gas': gas_data, 'pillar3_user': user_data})
         
         # Tạo matrix (Gas Cost vs User Activity)
-        # Normalize values
-        gas_normalized = min(estimated_gas / 100, 1.0)  # Giả định max 100 Gwei
-        activity_normalized = peak_hour / 24.0
+        # Normalize values (giả định max 100 Gwei)
+        gas_normalized = float(metrics['gas_normalized'])
+        activity_normalized = float(metrics['activity_normalized'])
         
         # Tạo heatmap
         matrix = np.array([[gas_normalized, activity_normalized]])
@@ -531,7 +947,9 @@ class AdvancedVisualizationService:
         ax.text(1, 0, f'{peak_hour}:00\nUTC', ha='center', va='center',
                fontsize=10, fontweight='bold', color='white' if activity_normalized < 0.5 else 'black')
     
-    def _draw_strategic_insights(self, ax, results: Dict, contract_address: str):
+    def _draw_strategic_insights(self, ax, results: Dict, contract_address: str,
+                                 best_time: Optional[pd.Timestamp] = None,
+                                 metrics: Optional[Dict] = None):
         """Vẽ Strategic Insights Summary."""
         ax.set_xlim([0, 1])
         ax.set_ylim([0, 1])
@@ -543,33 +961,34 @@ class AdvancedVisualizationService:
         
         insights = []
         
+        if best_time is None:
+            best_time = self._parse_best_window(p2)
+        if metrics is None:
+            metrics = self._dashboard_metrics(results, best_time)
+        
         # Insight 1
-        risk_score = p1.get('final_risk_score', 0)
-        if risk_score < 0.4:
+        risk_band = metrics['risk_band']
+        if risk_band == 0:
             insights.append("✓ Low Risk - Safe to Proceed")
-        elif risk_score < 0.75:
+        elif risk_band == 1:
             insights.append("⚠ Medium Risk - Review Required")
         else:
             insights.append("✗ High Risk - Critical Review")
         
         # Insight 2
-        best_window = p2.get('best_window_start_utc', '')
-        if best_window:
-            insights.append(f"✓ Optimal Gas Window:\n  {pd.to_datetime(best_window).strftime('%m/%d %H:00')} UTC")
+        if best_time is not None:
+            insights.append(f"✓ Optimal Gas Window:\n  {best_time.strftime('%m/%d %H:00')} UTC")
         
         # Insight 3
         peak_hour = p3.get('peak_activity_hour', 14)
         insights.append(f"✓ Peak User Activity:\n  {peak_hour}:00 UTC")
         
         # Insight 4: Trade-off
-        try:
-            gas_hour = pd.to_datetime(best_window).hour if best_window else 12
-            if abs(gas_hour - peak_hour) <= 4:
-                insights.append("✓ Perfect Alignment:\n  Gas & Users Match")
-            else:
-                insights.append(f"⚠ Trade-off Required:\n  {abs(gas_hour - peak_hour)}h gap")
-        except:
-            pass
+        hour_gap = int(metrics['hour_gap'])
+        if hour_gap <= 4:
+            insights.append("✓ Perfect Alignment:\n  Gas & Users Match")
+        else:
+            insights.append(f"⚠ Trade-off Required:\n  {hour_gap}h gap")
         
         y_pos = 0.9
         for insight in insights[:4]:
@@ -583,9 +1002,9 @@ class AdvancedVisualizationService:
     def _draw_pareto_frontier(self, ax, gas_data: Dict, user_data: Dict):
         """Vẽ Pareto Frontier cho Trade-off Analysis."""
         # Generate sample points
-        hours = np.arange(0, 24)
-        gas_prices = 50 + 10 * np.sin(hours * np.pi / 12) + np.random.randn(24) * 5
-        user_activity = 50 + 30 * np.cos((hours - user_data.get('peak_activity_hour', 14)) * np.pi / 12)
+        hours = _HOURS24
+        gas_prices = 50 + 10 * _SIN_H + np.random.randn(24) * 5
+        user_activity = 50 + 30 * _peak_cos(user_data.get('peak_activity_hour', 14))
         
         # Normalize (invert gas - lower is better)
         gas_normalized = 1 - (gas_prices - gas_prices.min()) / (gas_prices.max() - gas_prices.min())
@@ -594,14 +1013,7 @@ class AdvancedVisualizationService:
         ax.scatter(gas_normalized, user_activity, alpha=0.3, color='gray', s=50)
         
         # Find Pareto frontier
-        pareto_mask = np.ones(len(hours), dtype=bool)
-        for i in range(len(hours)):
-            for j in range(len(hours)):
-                if (gas_normalized[j] >= gas_normalized[i] and 
-                    user_activity[j] >= user_activity[i] and
-                    (gas_normalized[j] > gas_normalized[i] or user_activity[j] > user_activity[i])):
-                    pareto_mask[i] = False
-                    break
+        pareto_mask = _pareto_mask(gas_normalized, user_activity)
         
         pareto_x = gas_normalized[pareto_mask]
         pareto_y = user_activity[pareto_mask]
@@ -630,51 +1042,49 @@ class AdvancedVisualizationService:
     
     def _draw_3d_tradeoff_surface(self, ax, gas_data: Dict, user_data: Dict):
         """Vẽ 3D Trade-off Surface."""
-        from mpl_toolkits.mplot3d import Axes3D
-        
         # Chuyển sang 3D subplot
-        fig = plt.gcf()
+        fig = ax.figure
         ax.remove()
         ax_3d = fig.add_subplot(122, projection='3d')
         
         # Tạo grid
-        hours = np.linspace(0, 23, 24)
+        hours = _HOURS24
         days = np.linspace(1, 7, 7)
         H, D = np.meshgrid(hours, days)
         
-        # Tính gas và activity
-        gas_surface = 50 + 10 * np.sin(H * np.pi / 12)
-        activity_surface = 50 + 30 * np.cos((H - user_data.get('peak_activity_hour', 14)) * np.pi / 12)
-        
-        # Score = weighted combination (normalize)
-        gas_norm = (gas_surface - gas_surface.min()) / (gas_surface.max() - gas_surface.min())
-        activity_norm = (activity_surface - activity_surface.min()) / (activity_surface.max() - activity_surface.min())
-        score = 0.5 * (1 - gas_norm) + 0.5 * activity_norm
+        # Score chỉ phụ thuộc vào giờ -> tính 1 hàng 24 giá trị rồi broadcast theo ngày.
+        # Biên độ đã biết dạng đóng (sin/cos ∈ [-1, 1], đạt cực trị trên lưới giờ nguyên):
+        # gas ∈ [40, 60], activity ∈ [20, 80] -> không cần các lượt min()/max().
+        gas_lo, gas_hi = 40.0, 60.0
+        act_lo, act_hi = 20.0, 80.0
+        gas_row = 50 + 10 * _SIN_H
+        activity_row = 50 + 30 * _peak_cos(user_data.get('peak_activity_hour', 14))
+        score_row = (0.5 * (1 - (gas_row - gas_lo) / (gas_hi - gas_lo))
+                     + 0.5 * (activity_row - act_lo) / (act_hi - act_lo))
+        score = np.broadcast_to(score_row, H.shape)
         
         surf = ax_3d.plot_surface(H, D, score, cmap='RdYlGn', 
-                              alpha=0.8, linewidth=0, antialiased=True)
+                              alpha=0.8, linewidth=0, antialiased=False)
         
         ax_3d.set_xlabel('Hour (UTC)', fontsize=10)
         ax_3d.set_ylabel('Day', fontsize=10)
         ax_3d.set_zlabel('Optimality Score', fontsize=10)
         ax_3d.set_title('3D Trade-off Surface', fontsize=11, fontweight='bold')
-        plt.colorbar(surf, ax=ax_3d, shrink=0.5)
+        fig.colorbar(surf, ax=ax_3d, shrink=0.5)
     
     def _draw_risk_matrix(self, ax, risk_data: Dict):
         """Vẽ Risk Matrix (Severity vs Likelihood)."""
         severity = risk_data.get('final_risk_score', 0)
         likelihood = len(risk_data.get('dependency_risks', [])) / 5.0
         
-        # Tạo matrix
-        matrix = np.zeros((5, 5))
+        # Xác định vị trí (giới hạn trong lưới 5x5)
+        severity_idx = min(max(int(severity * 4), 0), 4)
+        likelihood_idx = min(max(int(likelihood * 4), 0), 4)
         
-        # Xác định vị trí
-        severity_idx = int(severity * 4)
-        likelihood_idx = int(likelihood * 4)
-        
-        matrix[severity_idx, likelihood_idx] = 1
-        
-        im = ax.imshow(matrix, cmap='RdYlGn_r', aspect='auto', vmin=0, vmax=1)
+        # Nền dùng chung + tô riêng ô hiện tại, không tạo matrix mới mỗi lần vẽ
+        im = ax.imshow(self._RISK_BG, cmap='RdYlGn_r', aspect='auto', vmin=0, vmax=1)
+        ax.add_patch(mpatches.Rectangle((likelihood_idx - 0.5, severity_idx - 0.5), 1, 1,
+                                        facecolor=im.cmap(1.0), edgecolor='none'))
         
         ax.set_xticks(range(5))
         ax.set_xticklabels(['Very Low', 'Low', 'Medium', 'High', 'Very High'])
@@ -688,7 +1098,7 @@ class AdvancedVisualizationService:
         ax.scatter([likelihood_idx], [severity_idx], color='black', 
                   s=300, marker='X', linewidths=2)
         
-        plt.colorbar(im, ax=ax)
+        ax.figure.colorbar(im, ax=ax)
     
     def _draw_risk_timeline(self, ax, risk_data: Dict):
         """Vẽ Risk Timeline (placeholder - cần historical data)."""
@@ -697,15 +1107,9 @@ class AdvancedVisualizationService:
                fontsize=12, bbox=dict(boxstyle='round', facecolor='lightgray'))
         ax.set_title('Risk Evolution Timeline', fontsize=12, fontweight='bold')
     
-    def _calculate_overall_recommendation(self, results: Dict) -> str:
-        """Tính toán overall recommendation."""
-        p1 = results.get('pillar1_risk', {})
-        risk_score = p1.get('final_risk_score', 0)
-        
-        if risk_score < 0.4:
-            return "PROCEED - LOW RISK"
-        elif risk_score < 0.75:
-            return "REVIEW - MEDIUM RISK"
-        else:
-            return "STOP - HIGH RISK"
-
+    def _calculate_overall_recommendation(self, results: Dict, risk_band: Optional[int] = None) -> str:
+        """Tính toán overall recommendation (risk_band: 0/1/2 nếu đã tính sẵn)."""
+        if risk_band is None:
+            risk_score = results.get('pillar1_risk', {}).get('final_risk_score', 0)
+            risk_band = int(np.searchsorted(RISK_THRESHOLDS, risk_score, side='right'))
+        return _RECOMMENDATIONS[int(risk_band)]
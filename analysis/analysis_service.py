@@ -2,11 +2,56 @@
 from analysis.pillar1_risk_model import ContractRiskAnalyzer
 from analysis.pillar2_gas_model import GasCostForecaster
 from analysis.pillar3_user_model import UserBehaviorAnalyzer
-from analysis.visualization import VisualizationService
-from analysis.advanced_visualization import AdvancedVisualizationService
 import pandas as pd
 import numpy as np
-from typing import Dict
+import atexit
+import copy
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import cached_property
+from pathlib import Path
+from typing import Dict, Optional
+
+try:
+    from cachetools import TTLCache
+except ImportError:
+    TTLCache = None
+
+logger = logging.getLogger("analysis.service")
+_log_listener = None
+
+def _setup_logging():
+    """
+    Gắn QueueHandler cho logger gốc của package "analysis" (service, data_cache, ...):
+    các thread trụ cột chỉ đẩy record vào hàng đợi, việc format và ghi stdout do một
+    thread QueueListener riêng đảm nhận.
+    Định dạng chỉ gồm message nên output giống như print() trước đây.
+    Không làm gì nếu ứng dụng đã cấu hình handler (cho "analysis" hoặc logger cha / root):
+    khi đó record đi theo cấu hình đó như bình thường.
+    """
+    global _log_listener
+    package_logger = logging.getLogger("analysis")
+    if _log_listener is not None or package_logger.hasHandlers():
+        return
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+    _log_listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
+    
+    package_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    if package_logger.level == logging.NOTSET:
+        package_logger.setLevel(logging.INFO)
+
+# Cache kết quả pillar trong bộ nhớ: tránh query lại BigQuery khi chạy lại cùng tham số
+PILLAR_CACHE_MAXSIZE = 1024
+PILLAR_CACHE_TTL = 300  # giây
 class AnalysisService:
     """
     Dịch vụ Tích hợp Framework.
@@ -101,18 +146,89 @@ class AnalysisService:
                  risk_analyzer: ContractRiskAnalyzer, 
                  gas_forecaster: GasCostForecaster, 
                  user_analyzer: UserBehaviorAnalyzer):
+        _setup_logging()
         self.risk_analyzer = risk_analyzer
         self.gas_forecaster = gas_forecaster
         self.user_analyzer = user_analyzer
         self.results = {}
         self.recommendations = []
-        self.visualization_service = VisualizationService()
-        self.advanced_viz_service = AdvancedVisualizationService()
+        self._recs_cache_key = None
+        # Giá trị dashboard trích từ self.results, tính lần đầu khi vẽ (xem _get_dashboard_features)
+        self._dashboard_features = None
+        # Đường dẫn PNG đã render cho self.results hiện tại: (loại biểu đồ, tham số) -> path
+        self._render_cache = {}
+        self._pillar_cache = (TTLCache(maxsize=PILLAR_CACHE_MAXSIZE, ttl=PILLAR_CACHE_TTL)
+                              if TTLCache is not None else None)
+        self._pillar_cache_lock = threading.RLock()
+
+    @cached_property
+    def visualization_service(self):
+        """Khởi tạo khi cần: tránh import matplotlib/seaborn nếu không vẽ biểu đồ."""
+        from analysis.visualization import VisualizationService
+        return VisualizationService()
+
+    @cached_property
+    def advanced_viz_service(self):
+        """Khởi tạo khi cần: tránh import matplotlib/seaborn nếu không vẽ biểu đồ."""
+        from analysis.advanced_visualization import AdvancedVisualizationService
+        return AdvancedVisualizationService()
+
+    def _invalidate_derived(self):
+        """Bỏ các giá trị suy ra từ self.results (gọi khi self.results được thay mới)."""
+        self._dashboard_features = None
+        self._render_cache = {}
+
+    def _render_once(self, key: tuple, save: bool, render):
+        """
+        Gọi render() để tạo biểu đồ, trừ khi cùng key đã được lưu ra file (và file còn đó)
+        cho bộ kết quả hiện tại -> trả lại đường dẫn cũ, không vẽ và ghi PNG lần nữa.
+        """
+        if not save:
+            return render()
+        cached = self._render_cache.get(key)
+        if cached and Path(cached).exists():
+            logger.info(f" [CACHE] {key[0]}: dùng lại {cached}")
+            return cached
+        path = render()
+        if path:
+            self._render_cache[key] = path
+        return path
+
+    def _get_dashboard_features(self) -> Dict:
+        """Giá trị dashboard của self.results, tính một lần cho mỗi bộ kết quả."""
+        if self._dashboard_features is None:
+            self._dashboard_features = self.advanced_viz_service.prepare_dashboard_features(self.results)
+        return self._dashboard_features
+
+    def _cached_run(self, pillar_name: str, fn, key_tuple: tuple, *args, **kw):
+        """
+        Chạy fn(*args, **kw) của một trụ cột, dùng lại kết quả trong TTL cache nếu
+        đã có với cùng (pillar_name, key_tuple, save_cache). Chỉ dùng cache khi use_cache=True;
+        không có cachetools thì chạy trực tiếp.
+        Cache lưu và trả về bản sao sâu: người gọi sửa kết quả (vd. p2['model_unreliable'])
+        không làm hỏng bản trong cache.
+        """
+        if self._pillar_cache is None or not kw.get('use_cache', False):
+            return fn(*args, **kw)
+        
+        key = (pillar_name, key_tuple, kw.get('save_cache', True))
+        with self._pillar_cache_lock:
+            cached = self._pillar_cache.get(key)
+        if cached is not None:
+            logger.info(f" [CACHE] {pillar_name}: dùng kết quả trong bộ nhớ (không chạy lại).")
+            return copy.deepcopy(cached)
+        
+        result = fn(*args, **kw)
+        with self._pillar_cache_lock:
+            self._pillar_cache[key] = copy.deepcopy(result)
+        return result
 
     def run_full_analysis(self, contract_address: str, wallet_list: list, campaign_start_date: str, 
-                         use_cache: bool = False, save_cache: bool = True):
+                         use_cache: bool = False, save_cache: bool = True, persist_results: bool = False):
         """
-        Chạy tuần tự cả 3 trụ cột phân tích.
+        Chạy song song cả 3 trụ cột phân tích.
+        Các trụ cột độc lập và chủ yếu chờ I/O (BigQuery, Etherscan) nên dùng thread
+        để chồng thời gian chờ: tổng thời gian ~ trụ cột chậm nhất thay vì tổng cả 3.
         
         Args:
             contract_address: Địa chỉ hợp đồng cần phân tích
@@ -120,25 +236,146 @@ class AnalysisService:
             campaign_start_date: Ngày bắt đầu chiến dịch
             use_cache: Nếu True, sẽ đọc từ cache nếu có, không query lại BigQuery
             save_cache: Nếu True, sẽ lưu kết quả vào cache sau khi phân tích
+            persist_results: Nếu True, lưu self.results tổng hợp (xem save_results) sau khi chạy xong
         """
-        print(" === BẮT ĐẦU CHẠY FRAMEWORK PHÂN TÍCH TỔNG HỢP === ")
+        logger.info(" === BẮT ĐẦU CHẠY FRAMEWORK PHÂN TÍCH TỔNG HỢP === ")
         if use_cache:
-            print(" [CACHE MODE] Đang sử dụng dữ liệu từ file cache (tiết kiệm chi phí BigQuery).")
+            logger.info(" [CACHE MODE] Đang sử dụng dữ liệu từ file cache (tiết kiệm chi phí BigQuery).")
         if save_cache:
-            print(" [SAVE MODE] Kết quả sẽ được lưu vào file để phân tích lại sau.")
+            logger.info(" [SAVE MODE] Kết quả sẽ được lưu vào file để phân tích lại sau.")
         
-        self.results['pillar1_risk'] = self.risk_analyzer.run(contract_address, use_cache=use_cache, save_cache=save_cache)
-        self.results['pillar2_gas'] = self.gas_forecaster.run(forecast_days=7, use_cache=use_cache, save_cache=save_cache)
-        self.results['pillar3_user'] = self.user_analyzer.run(wallet_list, campaign_start_date, use_cache=use_cache, save_cache=save_cache)
-        print("\n === PHÂN TÍCH TỔNG HỢP HOÀN TẤT === ")
+        forecast_days = 7
+        today_utc = datetime.now(timezone.utc).date()
+        
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = {
+                'pillar1_risk': executor.submit(
+                    self._cached_run, 'pillar1_risk', self.risk_analyzer.run,
+                    (contract_address.lower(),), contract_address,
+                    use_cache=use_cache, save_cache=save_cache),
+                'pillar2_gas': executor.submit(
+                    self._cached_run, 'pillar2_gas', self.gas_forecaster.run,
+                    (forecast_days, today_utc), forecast_days=forecast_days,
+                    use_cache=use_cache, save_cache=save_cache),
+                'pillar3_user': executor.submit(
+                    self._cached_run, 'pillar3_user', self.user_analyzer.run,
+                    (tuple(sorted(w.lower() for w in wallet_list)), campaign_start_date),
+                    wallet_list, campaign_start_date,
+                    use_cache=use_cache, save_cache=save_cache),
+            }
+            # Mỗi trụ cột chỉ ghi vào key riêng của nó trong self.results
+            for key, future in futures.items():
+                try:
+                    self.results[key] = future.result()
+                except Exception as e:
+                    raise RuntimeError(f"Phân tích {key} thất bại: {e}") from e
+        
+        self._invalidate_derived()
+        if persist_results:
+            self.save_results()
+        logger.info("\n === PHÂN TÍCH TỔNG HỢP HOÀN TẤT === ")
 
-    def generate_strategic_recommendations(self):
+    @staticmethod
+    def _window_hour(best_window) -> Optional[int]:
+        """
+        Lấy giờ từ 'best_window_start_utc' của Pillar 2.
+        Pillar 2 trả về str(Timestamp) dạng 'YYYY-MM-DD HH:MM:SS' (hoặc ISO với 'T'),
+        nên đọc thẳng 2 ký tự giờ; định dạng khác mới parse bằng fromisoformat.
+        Trả về None nếu không có cửa sổ ('N/A', None) hoặc không đọc được giờ.
+        """
+        if best_window is None or best_window == 'N/A':
+            return None
+        s = str(best_window)
+        if len(s) >= 13 and s[10] in ' T' and s[11:13].isdigit():
+            return int(s[11:13])
+        try:
+            return datetime.fromisoformat(s).hour
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _cohort_retention_totals(cohort_df: pd.DataFrame) -> tuple:
+        """Tổng (day_7_retained, cohort_size) của mọi cohort, tính trong một lượt NumPy."""
+        num, den = cohort_df[['day_7_retained', 'cohort_size']].to_numpy().sum(axis=0)
+        return num, den
+
+    def save_results(self, name: str = "latest_results") -> Path:
+        """
+        Lưu self.results ra đĩa (JSON + Parquet/CSV cho DataFrame, qua DataCache) để lần chạy
+        sau (process khác) dùng lại mà không phải chạy lại 3 trụ cột.
+        
+        Args:
+            name: Tên bộ kết quả (mặc định: data/results/latest_results.json)
+            
+        Returns:
+            Đường dẫn file JSON đã lưu
+        """
+        # Import DataCache ở đây để tránh circular import
+        from analysis.data_cache import DataCache
+        return DataCache().save_results(self.results, name)
+
+    def load_results(self, name: str = "latest_results") -> Optional[dict]:
+        """
+        Đọc kết quả đã lưu bởi save_results() vào self.results.
+        Dùng để tạo dashboard / so sánh mà không cần chạy lại run_full_analysis.
+        
+        Returns:
+            Dictionary kết quả, hoặc None nếu chưa có file
+        """
+        from analysis.data_cache import DataCache
+        results = DataCache().load_results(name)
+        if results is None:
+            logger.info(f" [RESULTS] Không tìm thấy kết quả đã lưu: {name}")
+            return None
+        self.results = results
+        self._invalidate_derived()
+        return self.results
+
+    def _recommendations_key(self) -> tuple:
+        """
+        Chữ ký của các đầu vào mà generate_strategic_recommendations sử dụng.
+        Cùng chữ ký -> cùng danh sách khuyến nghị, không cần dựng lại các chuỗi.
+        """
+        p1 = self.results['pillar1_risk']
+        p2 = self.results['pillar2_gas']
+        p3 = self.results['pillar3_user']
+        
+        cohort_df = p3.get('cohort_analysis', pd.DataFrame())
+        cohort_sig = None
+        if cohort_df is not None and not cohort_df.empty:
+            cohort_sig = (len(cohort_df),) + tuple(self._cohort_retention_totals(cohort_df))
+        accuracy = p2.get('model_accuracy')
+        
+        return (
+            p1.get('final_risk_score', 0),
+            len(p1.get('dependency_risks', [])),
+            str(p2.get('best_window_start_utc', 'N/A')),
+            tuple(sorted(accuracy.items())) if isinstance(accuracy, dict) else None,
+            p3.get('sybil_analysis', {}).get('total_clusters', 0),
+            cohort_sig,
+            p3.get('peak_activity_hour', 14),
+        )
+
+    def generate_strategic_recommendations(self, force_full_report: bool = True):
         """
         Phần cốt lõi: Tổng hợp kết quả và phân tích "Trade-offs"
         giữa các trụ cột [cite: 196, 258-261].
+        Nếu self.results không đổi kể từ lần gọi trước, dùng lại danh sách đã tạo.
+        
+        Args:
+            force_full_report: True (mặc định): luôn trả về báo cáo đầy đủ P1/P2/P3.
+                               Đặt False để khi P1 báo RỦI RO CAO chỉ trả về khuyến nghị
+                               dừng triển khai (bỏ qua P2/P3 vì không còn ý nghĩa).
         """
-        print("\n === BÁO CÁO HỖ TRỢ QUYẾT ĐỊNH CHIẾN LƯỢC === ")
-        self.recommendations = []
+        logger.info("\n === BÁO CÁO HỖ TRỢ QUYẾT ĐỊNH CHIẾN LƯỢC === ")
+        cache_key = self._recommendations_key() + (force_full_report,)
+        if cache_key == self._recs_cache_key:
+            self._print_recommendations()
+            return self.recommendations
+        
+        # Dựng vào list cục bộ, chỉ gán lại self.recommendations khi đã hoàn tất
+        recs = []
+        add = recs.append
         p1 = self.results['pillar1_risk']
         p2 = self.results['pillar2_gas']
         p3 = self.results['pillar3_user']
@@ -149,20 +386,23 @@ class AnalysisService:
             rec = (f"[CẢNH BÁO P1 - RỦI RO CAO]: Điểm rủi ro hợp đồng là {risk_score:.2f}. "
                    f"Phát hiện {len(p1.get('dependency_risks', []))} rủi ro phụ thuộc. "
                    "Cân nhắc HỦY BỎ hoặc kiểm toán khẩn cấp trước khi triển khai.")
-            self.recommendations.append(rec)
+            add(rec)
+            if not force_full_report:
+                # Rủi ro cao -> khuyến nghị dừng, các phân tích gas/user phía sau không đổi được quyết định
+                return self._publish_recommendations(recs, cache_key)
         elif risk_score > 0.4:
             rec = (f"[CẢNH BÁO P1 - RỦI RO TRUNG BÌNH]: Điểm rủi ro là {risk_score:.2f}. "
                    "Tiến hành thận trọng, thông báo rủi ro rõ ràng cho người dùng.")
-            self.recommendations.append(rec)
+            add(rec)
         else:
             rec = f"[OK P1]: Điểm rủi ro hợp đồng thấp ({risk_score:.2f}). An toàn để tiếp tục."
-            self.recommendations.append(rec)
+            add(rec)
 
         # 2. Phân tích P2: Chi phí Gas
         best_window = p2.get('best_window_start_utc', 'N/A')
         rec = f"[THÔNG TIN P2]: Cửa sổ gas tối ưu (rẻ nhất) trong 7 ngày tới " \
               f"dự kiến bắt đầu lúc {best_window} (UTC)."
-        self.recommendations.append(rec)
+        add(rec)
         
         # Hiển thị độ chính xác mô hình nếu có
         if 'model_accuracy' in p2:
@@ -206,7 +446,7 @@ class AnalysisService:
             else:
                 rec_accuracy = f"[ĐỘ TIN CẬY P2]: Mô hình đã được đánh giá (AIC: {accuracy.get('aic', 'N/A'):.2f}, BIC: {accuracy.get('bic', 'N/A'):.2f})."
             
-            self.recommendations.append(rec_accuracy)
+            add(rec_accuracy)
             
             # Lưu flag để sử dụng trong trade-off logic
             p2['model_unreliable'] = is_unreliable
@@ -217,24 +457,31 @@ class AnalysisService:
         if sybil_clusters > 0:
              rec = f"[CẢNH BÁO P3]: Phân tích Sybil phát hiện {sybil_clusters} cụm " \
                    "nghi vấn trong danh sách ví. Cần lọc trước khi airdrop."
-             self.recommendations.append(rec)
+             add(rec)
         if not cohort_df.empty:
-             avg_retention_d7 = cohort_df['day_7_retained'].sum() / cohort_df['cohort_size'].sum()
+             num, den = self._cohort_retention_totals(cohort_df)
+             avg_retention_d7 = num / den if den else 0.0
              rec = f"[THÔNG TIN P3]: Tỷ lệ giữ chân trung bình (Day 7) là {avg_retention_d7:.2%}."
-             self.recommendations.append(rec)
+             add(rec)
 
         # 4. Phân tích TRADE-OFF (Tổng hợp) [cite: 260, 261]
         
         # Trade-off P2 vs P3[cite: 260]:
-        try:
-            best_gas_hour = pd.to_datetime(best_window).hour
+        best_gas_hour = self._window_hour(best_window)
+        if best_gas_hour is None or 'peak_activity_hour' not in p3:
+            logger.info(f" [Trade-off] Bỏ qua: thiếu giờ gas ({best_window}) hoặc peak_activity_hour của P3.")
+        else:
             # Lấy giờ User hoạt động mạnh nhất từ kết quả P3
-            best_user_hour = p3.get('peak_activity_hour', 14)
+            best_user_hour = p3['peak_activity_hour']
             
             # Kiểm tra xem mô hình P2 có đáng tin cậy không
             model_unreliable = p2.get('model_unreliable', False)
             
-            print(f" [INFO] So sánh Trade-off: Gas rẻ nhất {best_gas_hour}h vs User đông nhất {best_user_hour}h")
+            logger.info(f" [INFO] So sánh Trade-off: Gas rẻ nhất {best_gas_hour}h vs User đông nhất {best_user_hour}h")
+            
+            # Khoảng cách giờ theo vòng 24h (23h và 1h cách nhau 2 giờ, không phải 22)
+            hour_gap = abs(best_gas_hour - best_user_hour) % 24
+            hour_gap = min(hour_gap, 24 - hour_gap)
             
             # NẾU MÔ HÌNH P2 KHÔNG ĐÁNG TIN CẬY: Bỏ qua P2, chỉ dùng P3
             if model_unreliable:
@@ -243,27 +490,34 @@ class AnalysisService:
                        f"Dự báo gas không đáng tin cậy. "
                        f"KHUYẾN NGHỊ: Bỏ qua cửa sổ gas tối ưu (P2), triển khai lúc {best_user_hour}:00 UTC "
                        f"theo giờ peak activity của người dùng (P3) để tối đa hóa ROI.")
-                self.recommendations.append(rec)
-            elif abs(best_gas_hour - best_user_hour) > 4:
+                add(rec)
+            elif hour_gap > 4:
                 # Nếu mô hình đáng tin cậy và có trade-off
                 rec = (f"[TRADE-OFF P2 vs P3]: Cửa sổ gas rẻ nhất (P2) lúc {best_gas_hour}:00 "
                        f"KHÔNG trùng với giờ hoạt động của người dùng chất lượng (P3) (Giá trị P3: {best_user_hour}:00). "
                        f"ĐỀ XUẤT: Chấp nhận chi phí gas cao hơn để triển khai lúc {best_user_hour}:00 "
                        "nhằm tối đa hóa ROI người dùng.")
-                self.recommendations.append(rec)
+                add(rec)
             else:
                 # Nếu giờ gas rẻ và giờ user gần nhau -> Tuyệt vời
                 rec = (f"[CƠ HỘI VÀNG]: Giờ gas rẻ ({best_gas_hour}h) trùng khớp với giờ người dùng hoạt động mạnh ({best_user_hour}h). "
                        "Đây là thời điểm triển khai hoàn hảo!")
-                self.recommendations.append(rec)
-        except Exception as e:
-            print(f" [Lỗi logic Trade-off]: {e}")
+                add(rec)
 
-        # In tất cả khuyến nghị
-        for r in self.recommendations:
-            print(f" {r}\n")
-            
+        return self._publish_recommendations(recs, cache_key)
+
+    def _publish_recommendations(self, recs: list, cache_key: tuple) -> list:
+        """Gán danh sách khuyến nghị đã dựng xong, ghi nhớ chữ ký đầu vào và in ra."""
+        self.recommendations = recs
+        self._recs_cache_key = cache_key
+        
+        self._print_recommendations()
         return self.recommendations
+
+    def _print_recommendations(self):
+        """In tất cả khuyến nghị trong một lần ghi (mỗi khuyến nghị cách nhau 1 dòng trống)."""
+        if self.recommendations:
+            logger.info("".join(f" {r}\n\n" for r in self.recommendations)[:-1])
     
     def visualize_results(self, contract_address: str, campaign_start_date: str, save: bool = True) -> dict:
         """
@@ -277,30 +531,34 @@ class AnalysisService:
         Returns:
             Dictionary chứa đường dẫn các file hình ảnh đã tạo
         """
-        print("\n=== TẠO BIỂU ĐỒ VISUALIZATION ===")
+        logger.info("\n=== TẠO BIỂU ĐỒ VISUALIZATION ===")
         
         visualization_paths = {}
         
         # Visualize từng Pillar
+        viz = self.visualization_service
         if 'pillar1_risk' in self.results:
-            path = self.visualization_service.visualize_pillar1_risk(
-                self.results['pillar1_risk'], contract_address, save=save
+            path = self._render_once(
+                ('pillar1', contract_address.lower()), save,
+                lambda: viz.visualize_pillar1_risk(self.results['pillar1_risk'], contract_address, save=save)
             )
             visualization_paths['pillar1'] = path
         
         if 'pillar2_gas' in self.results:
-            path = self.visualization_service.visualize_pillar2_gas(
-                self.results['pillar2_gas'], save=save
+            path = self._render_once(
+                ('pillar2',), save,
+                lambda: viz.visualize_pillar2_gas(self.results['pillar2_gas'], save=save)
             )
             visualization_paths['pillar2'] = path
         
         if 'pillar3_user' in self.results:
-            path = self.visualization_service.visualize_pillar3_user(
-                self.results['pillar3_user'], campaign_start_date, save=save
+            path = self._render_once(
+                ('pillar3', campaign_start_date), save,
+                lambda: viz.visualize_pillar3_user(self.results['pillar3_user'], campaign_start_date, save=save)
             )
             visualization_paths['pillar3'] = path
         
-        print("=== HOÀN TẤT VISUALIZATION ===\n")
+        logger.info("=== HOÀN TẤT VISUALIZATION ===\n")
         return visualization_paths
     
     def compare_with_previous(self, previous_results: dict, save: bool = True) -> str:
@@ -314,13 +572,13 @@ class AnalysisService:
         Returns:
             Đường dẫn file comparison đã tạo
         """
-        print("\n=== TẠO BIỂU ĐỒ SO SÁNH TRƯỚC/SAU ===")
+        logger.info("\n=== TẠO BIỂU ĐỒ SO SÁNH TRƯỚC/SAU ===")
         
         path = self.visualization_service.compare_before_after(
             previous_results, self.results, save=save
         )
         
-        print("=== HOÀN TẤT COMPARISON ===\n")
+        logger.info("=== HOÀN TẤT COMPARISON ===\n")
         return path
     
     def create_executive_dashboard(self, contract_address: str, campaign_start_date: str, save: bool = True) -> str:
@@ -336,11 +594,18 @@ class AnalysisService:
         Returns:
             Đường dẫn file dashboard đã tạo
         """
-        print("\n=== TẠO EXECUTIVE DASHBOARD ===")
-        path = self.advanced_viz_service.create_executive_dashboard(
-            self.results, contract_address, campaign_start_date, save=save
+        logger.info("\n=== TẠO EXECUTIVE DASHBOARD ===")
+        path = self._render_once(
+            ('executive_dashboard', contract_address.lower(), campaign_start_date), save,
+            lambda: self.advanced_viz_service.create_executive_dashboard(
+                self.results, contract_address, campaign_start_date, save=save,
+                features=self._get_dashboard_features()
+            )
         )
-        print("=== HOÀN TẤT EXECUTIVE DASHBOARD ===\n")
+        if save:
+            # PNG được ghi ở background: chờ ghi xong để đường dẫn trả về đã có file trên đĩa
+            self.advanced_viz_service.wait_for_writes()
+        logger.info("=== HOÀN TẤT EXECUTIVE DASHBOARD ===\n")
         return path
     
     def create_advanced_visualizations(self, contract_address: str, save: bool = True) -> Dict:
@@ -354,20 +619,25 @@ class AnalysisService:
         Returns:
             Dictionary chứa đường dẫn các file đã tạo
         """
-        print("\n=== TẠO ADVANCED VISUALIZATIONS ===")
+        logger.info("\n=== TẠO ADVANCED VISUALIZATIONS ===")
         
         paths = {}
+        adv = self.advanced_viz_service
         
         # Trade-off Analysis
-        paths['tradeoff'] = self.advanced_viz_service.create_tradeoff_analysis(
-            self.results, save=save
+        paths['tradeoff'] = self._render_once(
+            ('tradeoff',), save,
+            lambda: adv.create_tradeoff_analysis(self.results, save=save)
         )
         
         # Risk Heatmap
         if 'pillar1_risk' in self.results:
-            paths['risk_heatmap'] = self.advanced_viz_service.create_risk_heatmap(
-                self.results['pillar1_risk'], contract_address, save=save
+            paths['risk_heatmap'] = self._render_once(
+                ('risk_heatmap', contract_address.lower()), save,
+                lambda: adv.create_risk_heatmap(self.results['pillar1_risk'], contract_address, save=save)
             )
         
-        print("=== HOÀN TẤT ADVANCED VISUALIZATIONS ===\n")
+        if save:
+            adv.wait_for_writes()
+        logger.info("=== HOÀN TẤT ADVANCED VISUALIZATIONS ===\n")
         return paths
\ No newline at end of file
@@ -2,18 +2,113 @@
 """
 Module quản lý lưu trữ và đọc dữ liệu từ file để phân tích offline.
 Tiết kiệm chi phí BigQuery và cho phép phân tích lại dữ liệu đã lấy.
-Tất cả dữ liệu được lưu dưới dạng CSV để dễ phân tích trong thư mục data/.
+Các DataFrame được lưu dưới dạng Parquet (nếu có pyarrow, giữ nguyên dtype và đọc nhanh hơn),
+ngược lại dưới dạng CSV; file CSV cũ trong thư mục data/ vẫn đọc được.
 """
 import os
+import copy
 import json
+import logging
+import threading
+import numpy as np
 import pandas as pd
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from datetime import datetime
 from pathlib import Path
+from typing import Optional
+
+try:
+    import pyarrow  # noqa: F401  (engine cho DataFrame.to_parquet)
+    import pyarrow.feather as feather
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+try:
+    import orjson  # encoder/decoder JSON viết bằng Rust, nhanh hơn json chuẩn
+except ImportError:
+    orjson = None
+
+# Tham số truyền riêng (không dùng f-string) để bỏ qua việc format khi level INFO bị tắt
+logger = logging.getLogger(__name__)
+
+# Đuôi file cho các DataFrame cache
+FRAME_SUFFIX = ".parquet" if HAS_PYARROW else ".csv"
+# Gas lịch sử được đọc lại nhiều nhất -> Feather không nén, đọc bằng memory-map (gần như không copy)
+HISTORICAL_SUFFIX = ".feather" if HAS_PYARROW else ".csv"
+# Kích thước bộ đệm khi ghi CSV (chỉ dùng khi không có pyarrow)
+CSV_WRITE_BUFFER = 1024 * 1024
+
+def _json_default(obj):
+    """Cho json.dump: đổi numpy scalar/array (vd. np.int64) sang kiểu Python, Timestamp sang chuỗi ISO."""
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+@lru_cache(maxsize=256)
+def _safe_address(contract_address: str) -> str:
+    """Địa chỉ hợp đồng dùng trong tên file: chữ thường, bỏ tiền tố '0x'."""
+    return contract_address.lower().removeprefix("0x")
+
+@lru_cache(maxsize=256)
+def _safe_date(campaign_start_date: str) -> str:
+    """Ngày dùng trong tên file: bỏ dấu '-' (2025-06-23 -> 20250623)."""
+    return campaign_start_date.replace("-", "")
+
+# Bộ nhớ đệm trong tiến trình cho các file cache đã parse, dùng chung giữa mọi instance DataCache
+# (mỗi pillar tạo DataCache mới ở mỗi lần chạy). Key (đường dẫn, mtime_ns): file bị ghi lại thì key đổi.
+MEM_CACHE_MAXSIZE = 64
+_mem_cache = OrderedDict()
+_mem_cache_lock = threading.Lock()
+
+def _memoized(path: Path, parse, variant=None):
+    """
+    Trả về parse(path), dùng lại kết quả đã parse nếu file chưa thay đổi (LRU, tối đa MEM_CACHE_MAXSIZE).
+    Mỗi lần gọi nhận một bản sao (DataFrame.copy / deepcopy): nơi gọi sửa kết quả không làm hỏng bộ nhớ đệm.
+    variant phân biệt các cách đọc khác nhau của cùng một file (vd. danh sách cột).
+    """
+    key = (str(path), path.stat().st_mtime_ns, variant)
+    with _mem_cache_lock:
+        if key in _mem_cache:
+            _mem_cache.move_to_end(key)
+            return _copy_value(_mem_cache[key])
+    
+    value = parse(path)
+    with _mem_cache_lock:
+        _mem_cache[key] = value
+        if len(_mem_cache) > MEM_CACHE_MAXSIZE:
+            _mem_cache.popitem(last=False)
+    return _copy_value(value)
+
+def _copy_value(value):
+    """Bản sao của một giá trị trong bộ nhớ đệm (DataFrame: copy dữ liệu, còn lại: deepcopy)."""
+    if isinstance(value, pd.DataFrame):
+        return value.copy()
+    return copy.deepcopy(value)
+
+def _ensure_dir(directory: Path):
+    """Tạo thư mục (và thư mục cha) nếu chưa có, kể cả khi thư mục đã bị xóa giữa chừng."""
+    directory.mkdir(parents=True, exist_ok=True)
+
+def _tmp_path(path: Path) -> Path:
+    """File tạm cùng thư mục với path (ghi xong mới os.replace -> người đọc không thấy file ghi dở)."""
+    return path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+def _forget(path: Path):
+    """Bỏ các bản parse cũ của một file vừa được ghi lại."""
+    path_str = str(path)
+    with _mem_cache_lock:
+        for key in [k for k in _mem_cache if k[0] == path_str]:
+            del _mem_cache[key]
 
 class DataCache:
     """
     Lớp quản lý cache dữ liệu cho Framework.
-    Lưu và đọc kết quả phân tích vào/từ các file CSV trong thư mục data/.
+    Lưu và đọc kết quả phân tích vào/từ các file Parquet/CSV trong thư mục data/.
     """
     
     def __init__(self, base_dir: str = "data"):
@@ -25,54 +120,225 @@ class DataCache:
         """
         self.base_dir = Path(base_dir)
         self.base_dir.mkdir(exist_ok=True)
+        # Các thư mục con được tạo khi ghi file vào đó (xem _ensure_dir)
         
-        # Tạo các thư mục con
-        (self.base_dir / "pillar1_risk").mkdir(exist_ok=True)
-        (self.base_dir / "pillar2_gas").mkdir(exist_ok=True)
-        (self.base_dir / "pillar2_gas" / "historical").mkdir(exist_ok=True)
-        (self.base_dir / "pillar2_gas" / "forecast").mkdir(exist_ok=True)
-        (self.base_dir / "pillar3_user").mkdir(exist_ok=True)
-        (self.base_dir / "pillar3_user" / "cohort").mkdir(exist_ok=True)
-        
+    @staticmethod
+    def _pillar1_stem(contract_address: str) -> str:
+        """Phần tên chung (chưa có đuôi) của mọi file Pillar 1 cho một hợp đồng."""
+        return f"risk_{_safe_address(contract_address)}"
+    
+    def _get_pillar1_json_path(self, contract_address: str) -> Path:
+        """Tạo đường dẫn file kết quả Pillar 1 (JSON)."""
+        return self.base_dir / "pillar1_risk" / f"{self._pillar1_stem(contract_address)}.json"
+    
     def _get_pillar1_path(self, contract_address: str) -> Path:
-        """Tạo đường dẫn file cho Pillar 1 (CSV)."""
-        safe_address = contract_address.lower().replace("0x", "")
-        return self.base_dir / "pillar1_risk" / f"risk_{safe_address}.csv"
+        """Tạo đường dẫn bảng metric/value/type của Pillar 1 (định dạng cache cũ, chỉ đọc)."""
+        return self.base_dir / "pillar1_risk" / f"{self._pillar1_stem(contract_address)}{FRAME_SUFFIX}"
     
     def _get_pillar1_metadata_path(self, contract_address: str) -> Path:
         """Tạo đường dẫn file metadata cho Pillar 1 (JSON - chỉ lưu metadata nhỏ)."""
-        safe_address = contract_address.lower().replace("0x", "")
-        return self.base_dir / "pillar1_risk" / f"risk_{safe_address}_metadata.json"
+        return self.base_dir / "pillar1_risk" / f"{self._pillar1_stem(contract_address)}_metadata.json"
     
-    def _get_pillar2_forecast_path(self, forecast_days: int = 7) -> Path:
-        """Tạo đường dẫn file cho dự báo gas Pillar 2 (CSV)."""
-        today = datetime.now().strftime("%Y%m%d")
-        return self.base_dir / "pillar2_gas" / "forecast" / f"gas_forecast_{forecast_days}d_{today}.csv"
-    
-    def _get_pillar2_forecast_metadata_path(self, forecast_days: int = 7) -> Path:
-        """Tạo đường dẫn file metadata cho dự báo gas (JSON - chỉ metadata nhỏ)."""
+    def _get_pillar2_forecast_paths(self, forecast_days: int = 7) -> tuple:
+        """
+        Tạo đường dẫn (file DataFrame dự báo, file metadata JSON) cho Pillar 2.
+        Lấy ngày một lần cho cả hai file để chúng luôn cùng ngày (kể cả khi chạy qua nửa đêm).
+        """
         today = datetime.now().strftime("%Y%m%d")
-        return self.base_dir / "pillar2_gas" / "forecast" / f"gas_forecast_{forecast_days}d_{today}_metadata.json"
+        forecast_dir = self.base_dir / "pillar2_gas" / "forecast"
+        name = f"gas_forecast_{forecast_days}d_{today}"
+        return forecast_dir / f"{name}{FRAME_SUFFIX}", forecast_dir / f"{name}_metadata.json"
     
     def _get_pillar2_historical_path(self, days_back: int = 30) -> Path:
         """Tạo đường dẫn file cho dữ liệu gas lịch sử (Pillar 2)."""
-        return self.base_dir / "pillar2_gas" / "historical" / f"gas_history_{days_back}d.csv"
+        return self.base_dir / "pillar2_gas" / "historical" / f"gas_history_{days_back}d{HISTORICAL_SUFFIX}"
+    
+    def _get_pillar3_json_path(self, campaign_start_date: str) -> Path:
+        """Tạo đường dẫn file kết quả Pillar 3 (JSON, không gồm cohort)."""
+        return self.base_dir / "pillar3_user" / f"user_analysis_{_safe_date(campaign_start_date)}.json"
     
     def _get_pillar3_path(self, campaign_start_date: str) -> Path:
-        """Tạo đường dẫn file cho Pillar 3 (CSV)."""
-        safe_date = campaign_start_date.replace("-", "")
-        return self.base_dir / "pillar3_user" / f"user_analysis_{safe_date}.csv"
+        """Tạo đường dẫn bảng metric/value/type của Pillar 3 (định dạng cache cũ, chỉ đọc)."""
+        return self.base_dir / "pillar3_user" / f"user_analysis_{_safe_date(campaign_start_date)}{FRAME_SUFFIX}"
     
     def _get_pillar3_cohort_path(self, campaign_start_date: str) -> Path:
-        """Tạo đường dẫn file cho Cohort analysis (CSV)."""
-        safe_date = campaign_start_date.replace("-", "")
-        return self.base_dir / "pillar3_user" / "cohort" / f"cohort_analysis_{safe_date}.csv"
+        """Tạo đường dẫn file cho Cohort analysis (Parquet/CSV)."""
+        return (self.base_dir / "pillar3_user" / "cohort"
+                / f"cohort_analysis_{_safe_date(campaign_start_date)}{FRAME_SUFFIX}")
+    
+    @staticmethod
+    def _write_frame(df: pd.DataFrame, path: Path, index: bool = False):
+        """Ghi DataFrame theo đuôi file: Parquet (snappy), Feather (không nén) hoặc CSV (ghi file tạm rồi đổi tên)."""
+        _ensure_dir(path.parent)
+        tmp_path = _tmp_path(path)
+        if path.suffix == ".parquet":
+            df.to_parquet(tmp_path, engine="pyarrow", compression="snappy", index=index)
+        elif path.suffix == ".feather":
+            feather.write_feather(pyarrow.Table.from_pandas(df, preserve_index=index), tmp_path,
+                                  compression="uncompressed")
+        else:
+            # Bộ đệm 1 MiB: ghi file CSV lớn bằng ít lệnh write() hơn bộ đệm mặc định 8 KiB
+            with open(tmp_path, 'w', encoding='utf-8', newline='', buffering=CSV_WRITE_BUFFER) as f:
+                df.to_csv(f, index=index)
+        os.replace(tmp_path, path)
+        _forget(path)
+    
+    @staticmethod
+    def _write_json(path: Path, obj, indent: Optional[int] = None):
+        """Ghi obj ra file JSON UTF-8 (giữ nguyên tiếng Việt, hỗ trợ numpy scalar/array; ghi file tạm rồi đổi tên)."""
+        _ensure_dir(path.parent)
+        tmp_path = _tmp_path(path)
+        if orjson is not None:
+            option = orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if indent else 0)
+            tmp_path.write_bytes(orjson.dumps(obj, option=option, default=_json_default))
+        else:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(obj, f, indent=indent, ensure_ascii=False, default=_json_default)
+        os.replace(tmp_path, path)
+        _forget(path)
+    
+    @staticmethod
+    def _read_json(path: Path):
+        """Đọc file JSON (qua bộ nhớ đệm trong tiến trình)."""
+        def parse(p):
+            if orjson is not None:
+                return orjson.loads(p.read_bytes())
+            with open(p, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return _memoized(path, parse)
+    
+    @staticmethod
+    def _find_frame(path: Path) -> Optional[Path]:
+        """Trả về file cache đang có: ưu tiên đường dẫn chuẩn, sau đó file Parquet/CSV cũ cùng tên."""
+        for candidate in (path, path.with_suffix(".parquet"), path.with_suffix(".csv")):
+            if candidate.exists():
+                return candidate
+        return None
+    
+    @staticmethod
+    def _read_frame(path: Path, index_col=None, columns: Optional[list] = None) -> pd.DataFrame:
+        """
+        Đọc DataFrame theo đuôi file. Parquet tự khôi phục index và dtype (kể cả datetime UTC).
+        columns: chỉ đọc các cột này (Parquet lưu theo cột nên các cột khác không được giải nén).
+        """
+        if path.suffix == ".parquet":
+            return pd.read_parquet(path, engine="pyarrow", columns=columns)
+        if path.suffix == ".feather":
+            return feather.read_table(path, columns=columns, memory_map=True).to_pandas()
+        return pd.read_csv(path, index_col=index_col, parse_dates=index_col is not None, usecols=columns)
     
     # ========== PILLAR 1: Risk Analysis ==========
     
+    def _get_etherscan_source_path(self, address: str) -> Path:
+        """Tạo đường dẫn file JSON chứa phản hồi getsourcecode của Etherscan cho một địa chỉ."""
+        return self.base_dir / "etherscan" / f"source_{_safe_address(address)}.json"
+    
+    def save_etherscan_source(self, address: str, source_data: list) -> bool:
+        """
+        Lưu phản hồi getsourcecode (trường 'result') của Etherscan cho một địa chỉ.
+        
+        Returns:
+            True nếu lưu thành công, False nếu có lỗi
+        """
+        try:
+            self._write_json(self._get_etherscan_source_path(address), source_data)
+            return True
+        except Exception as e:
+            logger.exception("[Cache] Lỗi khi lưu mã nguồn Etherscan: %s", e)
+            return False
+    
+    def load_etherscan_source(self, address: str, max_age: float, mutable_max_age: Optional[float] = None) -> list:
+        """
+        Đọc phản hồi getsourcecode đã lưu nếu file chưa quá max_age giây.
+        
+        Args:
+            address: Địa chỉ hợp đồng
+            max_age: Thời hạn (giây) cho mã nguồn đã verified
+            mutable_max_age: Thời hạn ngắn hơn cho hợp đồng proxy (Proxy == '1') hoặc chưa verified
+                (SourceCode rỗng), vì kết quả của chúng có thể thay đổi; None = dùng max_age
+        
+        Returns:
+            List 'result' của Etherscan, hoặc None nếu chưa có / đã hết hạn
+        """
+        path = self._get_etherscan_source_path(address)
+        try:
+            age = datetime.now().timestamp() - path.stat().st_mtime
+            if age > max_age:
+                return None
+            source_data = self._read_json(path)
+            if age > self.etherscan_source_ttl(source_data, max_age, mutable_max_age):
+                return None
+            return source_data
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.exception("[Cache] Lỗi khi đọc mã nguồn Etherscan: %s", e)
+            return None
+    
+    @staticmethod
+    def etherscan_source_ttl(source_data: list, max_age: float, mutable_max_age: Optional[float] = None) -> float:
+        """Thời hạn (giây) của một phản hồi getsourcecode: mutable_max_age nếu là proxy / chưa verified."""
+        if mutable_max_age is not None:
+            info = source_data[0] if source_data else {}
+            if info.get('Proxy') == '1' or not info.get('SourceCode'):
+                return mutable_max_age
+        return max_age
+    
+    def etherscan_source_saved_at(self, address: str) -> Optional[float]:
+        """Thời điểm (timestamp) file mã nguồn Etherscan được ghi, None nếu chưa có."""
+        try:
+            return self._get_etherscan_source_path(address).stat().st_mtime
+        except OSError:
+            return None
+    
+    def _get_slither_result_path(self, key: str) -> Path:
+        """Tạo đường dẫn file JSON chứa kết quả Slither (internal risk) theo khóa mã nguồn."""
+        return self.base_dir / "slither_results" / f"{key}.json"
+    
+    def save_slither_result(self, key: str, result: dict) -> bool:
+        """
+        Lưu kết quả Slither (dict internal risk) theo khóa mã nguồn.
+        
+        Returns:
+            True nếu lưu thành công, False nếu có lỗi
+        """
+        try:
+            self._write_json(self._get_slither_result_path(key), result)
+            return True
+        except Exception as e:
+            logger.exception("[Cache] Lỗi khi lưu kết quả Slither: %s", e)
+            return False
+    
+    def load_slither_result(self, key: str) -> dict:
+        """
+        Đọc kết quả Slither đã lưu theo khóa mã nguồn.
+        
+        Returns:
+            Bản sao dict internal risk, hoặc None nếu chưa có
+        """
+        path = self._get_slither_result_path(key)
+        if not path.exists():
+            return None
+        try:
+            return dict(self._read_json(path))
+        except Exception as e:
+            logger.exception("[Cache] Lỗi khi đọc kết quả Slither: %s", e)
+            return None
+    
+    def clear_etherscan_sources(self):
+        """Xóa toàn bộ phản hồi Etherscan và kết quả Slither đã lưu."""
+        for directory, pattern in ((self.base_dir / "etherscan", "source_*.json"),
+                                   (self.base_dir / "slither_results", "*.json")):
+            if directory.exists():
+                for path in directory.glob(pattern):
+                    path.unlink()
+                    _forget(path)
+    
+    
     def save_pillar1(self, contract_address: str, risk_data: dict) -> bool:
         """
-        Lưu kết quả phân tích rủi ro (Pillar 1) vào file CSV.
+        Lưu kết quả phân tích rủi ro (Pillar 1) vào file JSON.
+        Kết quả là dict lồng nhau (không phải bảng) nên ghi thẳng, không qua DataFrame.
         
         Args:
             contract_address: Địa chỉ hợp đồng
@@ -82,98 +348,30 @@ class DataCache:
             True nếu lưu thành công, False nếu có lỗi
         """
         try:
-            csv_path = self._get_pillar1_path(contract_address)
+            json_path = self._get_pillar1_json_path(contract_address)
             metadata_path = self._get_pillar1_metadata_path(contract_address)
             
-            # Chuyển đổi dữ liệu thành DataFrame
-            rows = []
-            
-            # Thông tin chính
-            rows.append({
-                "metric": "final_risk_score",
-                "value": risk_data.get("final_risk_score", 0),
-                "type": "score"
-            })
-            
-            # Internal risk
-            internal_risk = risk_data.get("internal_risk", {})
-            # Xử lý đúng: score = 0 là hợp lệ, chỉ dùng default 50 khi không có key 'score'
-            internal_score_raw = internal_risk.get("score")
-            if internal_score_raw is None:
-                internal_score_raw = 50  # Default khi không tìm thấy source code
-            internal_score_normalized = internal_score_raw / 100.0
-            rows.append({
-                "metric": "internal_risk_score",
-                "value": internal_score_normalized,
-                "type": "score"
-            })
-            
-            # Dependency risks
-            dependency_risks = risk_data.get("dependency_risks", [])
-            rows.append({
-                "metric": "dependency_risk_count",
-                "value": len(dependency_risks),
-                "type": "count"
-            })
-            
-            # Dependency graph nodes
-            dependency_nodes = risk_data.get("dependency_graph_nodes", [])
-            rows.append({
-                "metric": "dependency_nodes_count",
-                "value": len(dependency_nodes),
-                "type": "count"
-            })
-            
-            # Lưu danh sách rủi ro vào một cột riêng
-            if dependency_risks:
-                for i, risk in enumerate(dependency_risks):
-                    rows.append({
-                        "metric": f"dependency_risk_{i+1}",
-                        "value": risk,
-                        "type": "risk_description"
-                    })
-            
-            # Lưu danh sách nodes
-            if dependency_nodes:
-                for i, node in enumerate(dependency_nodes):
-                    rows.append({
-                        "metric": f"dependency_node_{i+1}",
-                        "value": node,
-                        "type": "address"
-                    })
-            
-            # Lưu issues từ internal risk
-            issues = internal_risk.get("issues_found", [])
-            if issues:
-                for i, issue in enumerate(issues):
-                    rows.append({
-                        "metric": f"internal_issue_{i+1}",
-                        "value": issue,
-                        "type": "issue_description"
-                    })
-            
-            df = pd.DataFrame(rows)
-            df.to_csv(csv_path, index=False, encoding='utf-8')
+            self._write_json(json_path, risk_data)
             
             # Lưu metadata nhỏ (timestamp, contract address)
             metadata = {
                 "contract_address": contract_address,
                 "timestamp": datetime.now().isoformat(),
-                "csv_file": str(csv_path)
+                "result_file": str(json_path)
             }
-            with open(metadata_path, 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, indent=2, ensure_ascii=False)
+            self._write_json(metadata_path, metadata, indent=2)
             
-            print(f"[Cache] Đã lưu kết quả Pillar 1 vào: {csv_path}")
+            logger.info("[Cache] Đã lưu kết quả Pillar 1 vào: %s", json_path)
             return True
             
         except Exception as e:
-            print(f"[Cache] Lỗi khi lưu Pillar 1: {e}")
+            logger.exception("[Cache] Lỗi khi lưu Pillar 1: %s", e)
             return False
     
     def load_pillar1(self, contract_address: str) -> dict:
         """
-        Đọc kết quả phân tích rủi ro (Pillar 1) từ file CSV.
+        Đọc kết quả phân tích rủi ro (Pillar 1) từ file JSON
+        (hoặc từ bảng metric/value/type cũ nếu chưa có file JSON).
         
         Args:
             contract_address: Địa chỉ hợp đồng
@@ -182,68 +380,83 @@ class DataCache:
             Dictionary chứa kết quả phân tích, hoặc None nếu không tìm thấy
         """
         try:
-            csv_path = self._get_pillar1_path(contract_address)
+            json_path = self._get_pillar1_json_path(contract_address)
             metadata_path = self._get_pillar1_metadata_path(contract_address)
             
-            if not csv_path.exists():
-                return None
-            
-            df = pd.read_csv(csv_path)
+            # dict(...): bản sao nông để nơi gọi thêm/sửa key không ảnh hưởng bộ nhớ đệm
+            if json_path.exists():
+                source_path = json_path
+                result = dict(self._read_json(json_path))
+            else:
+                source_path = self._find_frame(self._get_pillar1_path(contract_address))
+                if source_path is None:
+                    return None
+                result = dict(_memoized(source_path, lambda p: self._parse_pillar1_table(self._read_frame(p))))
             
             # Đọc metadata
             timestamp = None
             if metadata_path.exists():
-                with open(metadata_path, 'r', encoding='utf-8') as f:
-                    metadata = json.load(f)
-                    timestamp = metadata.get('timestamp')
-            
-            # Khôi phục dữ liệu từ DataFrame
-            result = {}
-            
-            # Đọc các giá trị số
-            final_risk_score_row = df[df['metric'] == 'final_risk_score']
-            if not final_risk_score_row.empty:
-                result['final_risk_score'] = float(final_risk_score_row.iloc[0]['value'])
-            
-            # Internal risk
-            internal_score_row = df[df['metric'] == 'internal_risk_score']
-            internal_score = 0.0
-            if not internal_score_row.empty:
-                internal_score = float(internal_score_row.iloc[0]['value'])
-            
-            # Issues
-            issue_rows = df[df['type'] == 'issue_description']
-            issues = issue_rows['value'].tolist() if not issue_rows.empty else []
-            
-            result['internal_risk'] = {
-                "score": int(internal_score * 100),
-                "issues_found": issues
-            }
-            
-            # Dependency risks
-            risk_rows = df[df['type'] == 'risk_description']
-            dependency_risks = risk_rows['value'].tolist() if not risk_rows.empty else []
-            result['dependency_risks'] = dependency_risks
-            
-            # Dependency nodes
-            node_rows = df[df['type'] == 'address']
-            dependency_nodes = node_rows['value'].tolist() if not node_rows.empty else []
-            result['dependency_graph_nodes'] = dependency_nodes
+                timestamp = self._read_json(metadata_path).get('timestamp')
             
-            print(f"[Cache] Đã đọc kết quả Pillar 1 từ: {csv_path}")
+            logger.info("[Cache] Đã đọc kết quả Pillar 1 từ: %s", source_path)
             if timestamp:
-                print(f"[Cache] Timestamp: {timestamp}")
+                logger.info("[Cache] Timestamp: %s", timestamp)
             return result
             
         except Exception as e:
-            print(f"[Cache] Lỗi khi đọc Pillar 1: {e}")
+            logger.exception("[Cache] Lỗi khi đọc Pillar 1: %s", e)
             return None
     
+    @staticmethod
+    def _index_table(df: pd.DataFrame):
+        """
+        Lập chỉ mục một lần cho bảng metric/value/type thay vì lọc df[df[...] == ...] cho từng giá trị.
+        
+        Returns:
+            (values, row_of, rows_of_type): mảng cột value, dict metric -> vị trí dòng,
+            dict type -> mảng vị trí các dòng (theo thứ tự trong file)
+        """
+        values = df['value'].to_numpy()
+        # Mỗi metric chỉ xuất hiện một lần; đảo ngược để dòng đầu tiên được giữ nếu bị trùng
+        row_of = {m: i for i, m in reversed(list(enumerate(df['metric'].to_numpy())))}
+        rows_of_type = df.groupby('type', sort=False).indices
+        return values, row_of, rows_of_type
+    
+    @staticmethod
+    def _parse_pillar1_table(df: pd.DataFrame) -> dict:
+        """Khôi phục kết quả Pillar 1 từ bảng metric/value/type (định dạng cache cũ)."""
+        values, row_of, rows_of_type = DataCache._index_table(df)
+        result = {}
+        
+        def values_of_type(type_name: str) -> list:
+            idx = rows_of_type.get(type_name)
+            return values[idx].tolist() if idx is not None else []
+        
+        # Đọc các giá trị số
+        if 'final_risk_score' in row_of:
+            result['final_risk_score'] = float(values[row_of['final_risk_score']])
+        
+        # Internal risk
+        internal_score = 0.0
+        if 'internal_risk_score' in row_of:
+            internal_score = float(values[row_of['internal_risk_score']])
+        
+        result['internal_risk'] = {
+            "score": int(internal_score * 100),
+            "issues_found": values_of_type('issue_description')
+        }
+        
+        # Dependency risks / nodes
+        result['dependency_risks'] = values_of_type('risk_description')
+        result['dependency_graph_nodes'] = values_of_type('address')
+        
+        return result
+    
     # ========== PILLAR 2: Gas Forecast ==========
     
     def save_pillar2_historical(self, gas_data, days_back: int = 30) -> bool:
         """
-        Lưu dữ liệu gas lịch sử vào file CSV.
+        Lưu dữ liệu gas lịch sử vào file Parquet/CSV.
         
         PHASE 2: Hỗ trợ cả DataFrame (SARIMAX với exog) và Series (old ARIMA).
         
@@ -259,10 +472,11 @@ class DataCache:
             
             if isinstance(gas_data, pd.DataFrame):
                 # PHASE 2: Save full DataFrame with all columns
-                df = gas_data.copy()
-                df = df.reset_index()  # Move index to column named 'hour'
-                if df.columns[0] != 'hour':
-                    df.rename(columns={df.columns[0]: 'hour'}, inplace=True)
+                # reset_index() đã trả về bản sao nên không cần .copy() trước đó
+                df = gas_data.reset_index()  # Move index to column named 'hour'
+                cols = list(df.columns)
+                cols[0] = 'hour'
+                df.columns = cols
             else:
                 # Old format: Series -> convert to DataFrame
                 df = pd.DataFrame({
@@ -270,56 +484,85 @@ class DataCache:
                     'avg_gwei': gas_data.values
                 })
             
-            df.to_csv(file_path, index=False)
-            print(f"[Cache] Đã lưu dữ liệu gas lịch sử ({days_back}d) vào: {file_path}")
+            self._write_frame(self._downcast_lossless(df), file_path)
+            logger.info("[Cache] Đã lưu dữ liệu gas lịch sử (%sd) vào: %s", days_back, file_path)
             return True
         except Exception as e:
-            print(f"[Cache] Lỗi khi lưu dữ liệu gas lịch sử: {e}")
+            logger.exception("[Cache] Lỗi khi lưu dữ liệu gas lịch sử: %s", e)
             return False
     
-    def load_pillar2_historical(self, days_back: int = 30):
+    def load_pillar2_historical(self, days_back: int = 30, columns: Optional[list] = None):
         """
-        Đọc dữ liệu gas lịch sử từ file CSV.
+        Đọc dữ liệu gas lịch sử từ file Parquet/CSV.
         
         PHASE 2: Trả về DataFrame nếu có exogenous variables, Series nếu chỉ có avg_gwei.
         
         Args:
             days_back: Số ngày dữ liệu cần đọc
+            columns: Chỉ đọc các cột này (vd. ['avg_gwei']); None = đọc tất cả. Cột 'hour' luôn được đọc.
             
         Returns:
             Pandas DataFrame (SARIMAX) hoặc Series (old ARIMA) hoặc None nếu không tìm thấy
         """
         try:
-            file_path = self._get_pillar2_historical_path(days_back)
+            file_path = self._find_frame(self._get_pillar2_historical_path(days_back))
             
-            if not file_path.exists():
+            if file_path is None:
                 return None
             
-            df = pd.read_csv(file_path)
-            df['hour'] = pd.to_datetime(df['hour'], utc=True)
-            df.set_index('hour', inplace=True)
+            if columns is not None:
+                columns = ['hour'] + [c for c in columns if c != 'hour']
+            df = _memoized(file_path, lambda p: self._parse_historical(p, columns),
+                           variant=tuple(columns) if columns is not None else None)
             
-            print(f"[Cache] Đã đọc dữ liệu gas lịch sử ({days_back}d) từ: {file_path}")
+            logger.info("[Cache] Đã đọc dữ liệu gas lịch sử (%sd) từ: %s", days_back, file_path)
             
             # PHASE 2: Check if exogenous variables exist
             exog_cols = [col for col in df.columns if col != 'avg_gwei']
             
             if exog_cols:
                 # Return full DataFrame (SARIMAX format)
-                print(f"[Cache] Phát hiện exogenous variables: {exog_cols}")
+                logger.info("[Cache] Phát hiện exogenous variables: %s", exog_cols)
                 return df
             else:
                 # Return Series (old ARIMA format, backward compatibility)
-                print("[Cache] Dữ liệu old format (chỉ có avg_gwei)")
+                logger.info("[Cache] Dữ liệu old format (chỉ có avg_gwei)")
                 return df['avg_gwei']
             
         except Exception as e:
-            print(f"[Cache] Lỗi khi đọc dữ liệu gas lịch sử: {e}")
+            logger.exception("[Cache] Lỗi khi đọc dữ liệu gas lịch sử: %s", e)
             return None
     
+    @classmethod
+    def _parse_historical(cls, file_path: Path, columns: Optional[list] = None) -> pd.DataFrame:
+        """Đọc file gas lịch sử thành DataFrame có index 'hour' (UTC)."""
+        df = cls._read_frame(file_path, columns=columns)
+        if file_path.suffix == ".csv":
+            # Parquet/Feather đã giữ kiểu datetime64[ns, UTC]; chỉ CSV mới phải parse lại
+            df['hour'] = pd.to_datetime(df['hour'], utc=True)
+        # Pillar 2 làm việc với float64 (xem _fetch_hourly_gas): trả các cột đã thu gọn về float64
+        narrow_cols = df.select_dtypes('float32').columns
+        if len(narrow_cols):
+            df[narrow_cols] = df[narrow_cols].astype('float64')
+        return df.set_index('hour')
+    
+    @staticmethod
+    def _downcast_lossless(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Lưu dạng float32 các cột float64 biểu diễn được chính xác bằng float32
+        (transaction_count, day_of_week, hour_of_day: số nguyên nhỏ, có thể có NaN).
+        Không mất dữ liệu; cột số thực như avg_gwei giữ nguyên float64.
+        """
+        for col in df.select_dtypes('float64').columns:
+            values = df[col].to_numpy()
+            narrow = values.astype(np.float32)
+            if np.array_equal(narrow.astype(np.float64), values, equal_nan=True):
+                df[col] = narrow
+        return df
+    
     def save_pillar2(self, forecast_data: dict, forecast_days: int = 7) -> bool:
         """
-        Lưu kết quả dự báo gas (Pillar 2) vào file CSV.
+        Lưu kết quả dự báo gas (Pillar 2) vào file Parquet/CSV.
         
         Args:
             forecast_data: Dictionary chứa kết quả dự báo
@@ -329,39 +572,37 @@ class DataCache:
             True nếu lưu thành công
         """
         try:
-            csv_path = self._get_pillar2_forecast_path(forecast_days)
-            metadata_path = self._get_pillar2_forecast_metadata_path(forecast_days)
+            csv_path, metadata_path = self._get_pillar2_forecast_paths(forecast_days)
             
-            # Lưu forecast DataFrame vào CSV
+            # Lưu forecast DataFrame (giữ index thời gian)
             if "forecast_dataframe" in forecast_data:
                 df = forecast_data["forecast_dataframe"]
-                df.to_csv(csv_path, index=True)
-                print(f"[Cache] Đã lưu forecast DataFrame vào: {csv_path}")
+                self._write_frame(df, csv_path, index=True)
+                logger.info("[Cache] Đã lưu forecast DataFrame vào: %s", csv_path)
             
             # Lưu metadata (best_window, metrics, accuracy)
             metadata = {
                 "timestamp": datetime.now().isoformat(),
                 "forecast_days": forecast_days,
                 "best_window_start_utc": forecast_data.get("best_window_start_utc"),
-                "estimated_avg_gwei": float(forecast_data.get("estimated_avg_gwei", 0)),
+                "estimated_avg_gwei": forecast_data.get("estimated_avg_gwei", 0),
                 "model_accuracy": forecast_data.get("model_accuracy"),
                 "model_fit_metrics": forecast_data.get("model_fit_metrics"),
                 "forecast_csv": str(csv_path)
             }
             
-            with open(metadata_path, 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, indent=2, ensure_ascii=False)
+            self._write_json(metadata_path, metadata, indent=2)
             
-            print(f"[Cache] Đã lưu metadata Pillar 2 vào: {metadata_path}")
+            logger.info("[Cache] Đã lưu metadata Pillar 2 vào: %s", metadata_path)
             return True
             
         except Exception as e:
-            print(f"[Cache] Lỗi khi lưu Pillar 2: {e}")
+            logger.exception("[Cache] Lỗi khi lưu Pillar 2: %s", e)
             return False
     
     def load_pillar2(self, forecast_days: int = 7) -> dict:
         """
-        Đọc kết quả dự báo gas (Pillar 2) từ file CSV.
+        Đọc kết quả dự báo gas (Pillar 2) từ file Parquet/CSV.
         
         Args:
             forecast_days: Số ngày dự báo
@@ -370,18 +611,17 @@ class DataCache:
             Dictionary chứa kết quả dự báo hoặc None
         """
         try:
-            csv_path = self._get_pillar2_forecast_path(forecast_days)
-            metadata_path = self._get_pillar2_forecast_metadata_path(forecast_days)
+            csv_path, metadata_path = self._get_pillar2_forecast_paths(forecast_days)
+            csv_path = self._find_frame(csv_path)
             
-            if not csv_path.exists() or not metadata_path.exists():
+            if csv_path is None or not metadata_path.exists():
                 return None
             
             # Đọc metadata
-            with open(metadata_path, 'r', encoding='utf-8') as f:
-                metadata = json.load(f)
+            metadata = self._read_json(metadata_path)
             
             # Đọc forecast DataFrame
-            forecast_df = pd.read_csv(csv_path, index_col=0, parse_dates=True)
+            forecast_df = _memoized(csv_path, lambda p: self._read_frame(p, index_col=0))
             
             result = {
                 "best_window_start_utc": metadata.get("best_window_start_utc"),
@@ -391,19 +631,20 @@ class DataCache:
                 "model_fit_metrics": metadata.get("model_fit_metrics")
             }
             
-            print(f"[Cache] Đã đọc kết quả Pillar 2 từ: {csv_path}")
-            print(f"[Cache] Timestamp: {metadata.get('timestamp', 'N/A')}")
+            logger.info("[Cache] Đã đọc kết quả Pillar 2 từ: %s", csv_path)
+            logger.info("[Cache] Timestamp: %s", metadata.get('timestamp', 'N/A'))
             return result
             
         except Exception as e:
-            print(f"[Cache] Lỗi khi đọc Pillar 2: {e}")
+            logger.exception("[Cache] Lỗi khi đọc Pillar 2: %s", e)
             return None
     
     # ========== PILLAR 3: User Behavior ==========
     
     def save_pillar3(self, user_data: dict, campaign_start_date: str) -> bool:
         """
-        Lưu kết quả phân tích người dùng (Pillar 3) vào file CSV.
+        Lưu kết quả phân tích người dùng (Pillar 3): phần dict vào file JSON,
+        cohort DataFrame vào file Parquet/CSV riêng.
         
         Args:
             user_data: Dictionary chứa kết quả phân tích
@@ -413,58 +654,38 @@ class DataCache:
             True nếu lưu thành công
         """
         try:
-            csv_path = self._get_pillar3_path(campaign_start_date)
+            json_path = self._get_pillar3_json_path(campaign_start_date)
             cohort_path = self._get_pillar3_cohort_path(campaign_start_date)
             
-            # Chuyển đổi dữ liệu thành DataFrame
-            rows = []
-            
-            # Peak activity hour
-            rows.append({
-                "metric": "peak_activity_hour",
-                "value": user_data.get("peak_activity_hour", 14),
-                "type": "hour"
-            })
-            
-            # Sybil analysis
-            sybil_analysis = user_data.get("sybil_analysis", {})
-            rows.append({
-                "metric": "sybil_clusters_count",
-                "value": sybil_analysis.get("total_clusters", 0),
-                "type": "count"
-            })
-            
-            # Lưu các clusters
-            clusters = sybil_analysis.get("clusters", {})
-            if clusters:
-                for cluster_id, wallets in clusters.items():
-                    for i, wallet in enumerate(wallets):
-                        rows.append({
-                            "metric": f"sybil_cluster_{cluster_id}_wallet_{i+1}",
-                            "value": wallet,
-                            "type": "wallet_address"
-                        })
-            
-            df = pd.DataFrame(rows)
-            df.to_csv(csv_path, index=False, encoding='utf-8')
+            payload = {k: v for k, v in user_data.items() if k != "cohort_analysis"}
+            sybil_analysis = payload.get("sybil_analysis")
+            if sybil_analysis and sybil_analysis.get("clusters"):
+                # Cluster id từ DBSCAN là numpy int -> đổi sang chuỗi để làm key JSON
+                payload["sybil_analysis"] = {
+                    **sybil_analysis,
+                    "clusters": {str(cid): list(wallets) for cid, wallets in sybil_analysis["clusters"].items()}
+                }
+            
+            self._write_json(json_path, payload)
             
             # Lưu cohort DataFrame riêng
             if "cohort_analysis" in user_data:
                 cohort_df = user_data["cohort_analysis"]
                 if isinstance(cohort_df, pd.DataFrame) and not cohort_df.empty:
-                    cohort_df.to_csv(cohort_path, index=False)
-                    print(f"[Cache] Đã lưu cohort analysis vào: {cohort_path}")
+                    self._write_frame(cohort_df, cohort_path)
+                    logger.info("[Cache] Đã lưu cohort analysis vào: %s", cohort_path)
             
-            print(f"[Cache] Đã lưu kết quả Pillar 3 vào: {csv_path}")
+            logger.info("[Cache] Đã lưu kết quả Pillar 3 vào: %s", json_path)
             return True
             
         except Exception as e:
-            print(f"[Cache] Lỗi khi lưu Pillar 3: {e}")
+            logger.exception("[Cache] Lỗi khi lưu Pillar 3: %s", e)
             return False
     
     def load_pillar3(self, campaign_start_date: str) -> dict:
         """
-        Đọc kết quả phân tích người dùng (Pillar 3) từ file CSV.
+        Đọc kết quả phân tích người dùng (Pillar 3) từ file JSON
+        (hoặc từ bảng metric/value/type cũ nếu chưa có file JSON).
         
         Args:
             campaign_start_date: Ngày bắt đầu chiến dịch
@@ -473,56 +694,153 @@ class DataCache:
             Dictionary chứa kết quả phân tích hoặc None
         """
         try:
-            csv_path = self._get_pillar3_path(campaign_start_date)
-            cohort_path = self._get_pillar3_cohort_path(campaign_start_date)
-            
-            if not csv_path.exists():
-                return None
-            
-            df = pd.read_csv(csv_path)
+            json_path = self._get_pillar3_json_path(campaign_start_date)
+            cohort_path = self._find_frame(self._get_pillar3_cohort_path(campaign_start_date))
             
-            result = {}
-            
-            # Peak activity hour
-            peak_hour_row = df[df['metric'] == 'peak_activity_hour']
-            if not peak_hour_row.empty:
-                result['peak_activity_hour'] = int(peak_hour_row.iloc[0]['value'])
+            if json_path.exists():
+                source_path = json_path
+                result = dict(self._read_json(json_path))
+                result.setdefault('peak_activity_hour', 14)  # Default
             else:
-                result['peak_activity_hour'] = 14  # Default
-            
-            # Sybil analysis
-            cluster_count_row = df[df['metric'] == 'sybil_clusters_count']
-            total_clusters = 0
-            if not cluster_count_row.empty:
-                total_clusters = int(cluster_count_row.iloc[0]['value'])
-            
-            # Khôi phục clusters
-            clusters = {}
-            wallet_rows = df[df['type'] == 'wallet_address']
-            if not wallet_rows.empty:
-                for _, row in wallet_rows.iterrows():
-                    metric = row['metric']
-                    # Format: sybil_cluster_{cluster_id}_wallet_{i+1}
-                    parts = metric.split('_')
-                    if len(parts) >= 4:
-                        cluster_id = parts[2]
-                        if cluster_id not in clusters:
-                            clusters[cluster_id] = []
-                        clusters[cluster_id].append(row['value'])
-            
-            result['sybil_analysis'] = {
-                "total_clusters": total_clusters,
-                "clusters": clusters
-            }
+                source_path = self._find_frame(self._get_pillar3_path(campaign_start_date))
+                if source_path is None:
+                    return None
+                result = dict(_memoized(source_path, lambda p: self._parse_pillar3_table(self._read_frame(p))))
             
             # Đọc cohort DataFrame nếu có
-            if cohort_path.exists():
-                cohort_df = pd.read_csv(cohort_path)
+            if cohort_path is not None:
+                cohort_df = _memoized(cohort_path, self._read_frame)
                 result["cohort_analysis"] = cohort_df
             
-            print(f"[Cache] Đã đọc kết quả Pillar 3 từ: {csv_path}")
+            logger.info("[Cache] Đã đọc kết quả Pillar 3 từ: %s", source_path)
             return result
             
         except Exception as e:
-            print(f"[Cache] Lỗi khi đọc Pillar 3: {e}")
+            logger.exception("[Cache] Lỗi khi đọc Pillar 3: %s", e)
+            return None
+    
+    @staticmethod
+    def _parse_pillar3_table(df: pd.DataFrame) -> dict:
+        """Khôi phục kết quả Pillar 3 từ bảng metric/value/type (định dạng cache cũ)."""
+        values, row_of, rows_of_type = DataCache._index_table(df)
+        result = {}
+        
+        # Peak activity hour
+        if 'peak_activity_hour' in row_of:
+            result['peak_activity_hour'] = int(values[row_of['peak_activity_hour']])
+        else:
+            result['peak_activity_hour'] = 14  # Default
+        
+        # Sybil analysis
+        total_clusters = 0
+        if 'sybil_clusters_count' in row_of:
+            total_clusters = int(values[row_of['sybil_clusters_count']])
+        
+        # Khôi phục clusters (vector hóa: tách metric một lần rồi groupby theo cluster_id)
+        clusters = {}
+        wallet_rows = rows_of_type.get('wallet_address')
+        if wallet_rows is not None:
+            wallet_df = df.iloc[wallet_rows]
+            # Format: sybil_cluster_{cluster_id}_wallet_{i+1}
+            parts = wallet_df['metric'].str.split('_', n=3, expand=True)
+            if parts.shape[1] == 4:
+                valid = parts[3].notna()
+                clusters = (wallet_df.loc[valid.to_numpy(), 'value']
+                            .groupby(parts.loc[valid, 2].to_numpy(), sort=False)
+                            .apply(list).to_dict())
+        
+        result['sybil_analysis'] = {
+            "total_clusters": total_clusters,
+            "clusters": clusters
+        }
+        
+        return result
+    
+    # ========== TẤT CẢ PILLAR ==========
+    
+    def save_all(self, contract_address: str = None, risk_data: dict = None,
+                 forecast_data: dict = None, forecast_days: int = 7,
+                 user_data: dict = None, campaign_start_date: str = None) -> dict:
+        """
+        Lưu song song kết quả của các pillar được truyền vào.
+        Các lần lưu độc lập nhau và phần lớn thời gian là ghi đĩa / encode (pyarrow nhả GIL) nên dùng thread.
+        
+        Args:
+            contract_address, risk_data: Kết quả Pillar 1 (bỏ qua nếu risk_data là None)
+            forecast_data, forecast_days: Kết quả Pillar 2 (bỏ qua nếu forecast_data là None)
+            user_data, campaign_start_date: Kết quả Pillar 3 (bỏ qua nếu user_data là None)
+            
+        Returns:
+            Dict {'pillar1' | 'pillar2' | 'pillar3': True/False} cho các pillar đã lưu
+        """
+        jobs = {}
+        if risk_data is not None:
+            jobs['pillar1'] = (self.save_pillar1, contract_address, risk_data)
+        if forecast_data is not None:
+            jobs['pillar2'] = (self.save_pillar2, forecast_data, forecast_days)
+        if user_data is not None:
+            jobs['pillar3'] = (self.save_pillar3, user_data, campaign_start_date)
+        if not jobs:
+            return {}
+        
+        with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+            futures = {name: executor.submit(fn, *args) for name, (fn, *args) in jobs.items()}
+            return {name: future.result() for name, future in futures.items()}
+    
+    # ========== KẾT QUẢ TỔNG HỢP (AnalysisService.results) ==========
+    
+    def _get_results_path(self, name: str) -> Path:
+        """Tạo đường dẫn file JSON lưu kết quả tổng hợp của AnalysisService."""
+        return self.base_dir / "results" / f"{name}.json"
+    
+    def save_results(self, results: dict, name: str = "latest_results") -> Path:
+        """
+        Lưu kết quả tổng hợp (dict lồng nhau): mỗi DataFrame được ghi ra file Parquet/CSV riêng,
+        phần còn lại vào file JSON (ghi sau cùng, nên file JSON luôn trỏ tới các file đã ghi xong).
+        Key của dict được đổi sang chuỗi (vd. cluster id của DBSCAN).
+        
+        Args:
+            results: Dictionary kết quả (vd. AnalysisService.results)
+            name: Tên bộ kết quả (mặc định: "latest_results")
+            
+        Returns:
+            Đường dẫn file JSON đã lưu
+        """
+        json_path = self._get_results_path(name)
+        
+        def externalize(obj, key_path):
+            if isinstance(obj, dict):
+                return {str(k): externalize(v, key_path + (str(k),)) for k, v in obj.items()}
+            if isinstance(obj, pd.DataFrame):
+                frame_path = json_path.with_name(f"{name}__{'__'.join(key_path)}{FRAME_SUFFIX}")
+                self._write_frame(obj, frame_path, index=True)
+                return {"__frame__": frame_path.name}
+            return obj
+        
+        self._write_json(json_path, externalize(results, ()))
+        logger.info("[Cache] Đã lưu kết quả tổng hợp vào: %s", json_path)
+        return json_path
+    
+    def load_results(self, name: str = "latest_results") -> Optional[dict]:
+        """
+        Đọc kết quả tổng hợp đã lưu bởi save_results().
+        
+        Returns:
+            Dictionary kết quả (bản sao, được phép sửa) hoặc None nếu chưa có file
+        """
+        json_path = self._get_results_path(name)
+        if not json_path.exists():
             return None
+        
+        def internalize(obj):
+            if isinstance(obj, dict):
+                if set(obj) == {"__frame__"}:
+                    return self._read_frame(json_path.with_name(obj["__frame__"]), index_col=0)
+                return {k: internalize(v) for k, v in obj.items()}
+            if isinstance(obj, list):
+                return [internalize(v) for v in obj]
+            return obj
+        
+        results = internalize(self._read_json(json_path))
+        logger.info("[Cache] Đã đọc kết quả tổng hợp từ: %s", json_path)
+        return results
@@ -1,13 +1,132 @@
-import networkx as nx
 import subprocess
+import multiprocessing
+import queue
 import json
 import os
+import re
+import hashlib
+import importlib.metadata
 import tempfile
 import shutil
+import random
+import threading
+import time
 import requests  
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
 from core.config import Config
 from connectors.db_connector import BigQueryConnector
-import pandas as pd
+from google.cloud import bigquery
+
+try:
+    import orjson  # decoder JSON viết bằng Rust, nhanh hơn json chuẩn
+except ImportError:
+    orjson = None
+
+# orjson.loads nhận cả str lẫn bytes, lỗi là lớp con của json.JSONDecodeError
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+try:
+    # Phiên bản Slither nằm trong khóa cache kết quả: nâng cấp Slither -> phân tích lại
+    SLITHER_VERSION = importlib.metadata.version("slither-analyzer")
+except importlib.metadata.PackageNotFoundError:
+    SLITHER_VERSION = "unknown"
+
+try:
+    # Chạy Slither ngay trong tiến trình (không fork interpreter, không qua file JSON)
+    from slither.slither import Slither
+    from crytic_compile import CryticCompile  # đi kèm slither-analyzer
+    from slither.detectors import all_detectors
+    from slither.detectors.abstract_detector import AbstractDetector, DetectorClassification
+    # Chỉ chạy detector High/Medium/Low - điểm rủi ro không tính Informational/Optimization
+    SLITHER_DETECTORS = [
+        cls for cls in vars(all_detectors).values()
+        if isinstance(cls, type) and issubclass(cls, AbstractDetector)
+        and cls.IMPACT in (DetectorClassification.HIGH, DetectorClassification.MEDIUM, DetectorClassification.LOW)
+    ]
+except ImportError:
+    Slither = None
+
+# Gói miễn phí của Etherscan cho phép tối đa 5 request/giây
+ETHERSCAN_MAX_WORKERS = 5
+# Slither tốn CPU (mỗi lần chạy giữ một tiến trình con tới SLITHER_TIMEOUT) -> executor riêng, nhỏ,
+# để các lần kiểm tra phụ thuộc trên Etherscan không phải xếp hàng sau các lần chạy Slither
+SLITHER_MAX_WORKERS = 2
+ETHERSCAN_MAX_RPS = 5
+# Khi Etherscan báo "Max rate limit reached" (HTTP 200, status '0'): thử lại tối đa 3 lần,
+# chờ 1s, 2s, 4s (+ jitter ngẫu nhiên 0-1s để các luồng không cùng gọi lại một lúc)
+ETHERSCAN_RATE_LIMIT_RETRIES = 3
+ETHERSCAN_BACKOFF_BASE = 1.0
+
+# CompilerVersion của Etherscan, vd. "v0.8.19+commit.7dd6d404" -> "0.8.19" (Vyper không khớp)
+SOLC_VERSION_PATTERN = re.compile(r"^v?(\d+\.\d+\.\d+)")
+
+# Thời gian tối đa cho một lần chạy Slither (thư viện hoặc CLI)
+SLITHER_TIMEOUT = 60  # giây
+# Tiến trình Slither (thư viện) được dùng lại giữa các hợp đồng; khởi động lại sau từng ấy lần chạy
+# để giải phóng bộ nhớ tích lũy của Slither/crytic-compile
+SLITHER_WORKER_MAX_TASKS = 50
+
+# Artifact biên dịch (crytic-compile, định dạng standard) theo mã nguồn + phiên bản solc;
+# dùng lại trong 7 ngày để bỏ qua bước chạy solc khi phân tích lại cùng hợp đồng
+SLITHER_ARTIFACT_DIR = os.path.join("data", "slither_artifacts")
+SLITHER_ARTIFACT_TTL = 7 * 24 * 60 * 60  # giây
+
+# Số phụ thuộc rủi ro để Dependency Risk Score đạt tối đa (1.0)
+DEPENDENCY_RISK_CAP = 5
+
+# Hợp đồng đã được kiểm toán (địa chỉ chữ thường)
+KNOWN_AUDITED_CONTRACTS = frozenset({
+    "0xa0b86991c6218b36c1d19d4a2e9eb0ce3606eb48",  # USDC
+    "0xdac17f958d2ee523a2206206994597c13d831ec7",  # Tether (USDT)
+})
+# Danh sách bổ sung (tùy chọn): mảng JSON các địa chỉ đã kiểm toán, gộp với danh sách trên
+KNOWN_AUDITED_REGISTRY = os.path.join("data", "known_audited_contracts.json")
+
+# Solc/crytic-compile chỉ nhận đường dẫn file -> ghi mã nguồn vào tmpfs (RAM) nếu có,
+# tránh I/O đĩa thật; không có /dev/shm thì dùng thư mục tạm mặc định
+SOURCE_TMP_DIR = "/dev/shm" if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK) else None
+
+
+class _RateLimiter:
+    """
+    Giới hạn tốc độ gọi API dùng chung giữa các luồng:
+    mỗi lần acquire() cách lần trước ít nhất 1/rate giây.
+    """
+    def __init__(self, rate: float):
+        self._interval = 1.0 / rate
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self._interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def _slither_detect(contract_file: str, compile_kwargs: dict, artifact_key: str) -> list:
+    """Chạy Slither dạng thư viện trong tiến trình con (xem ContractRiskAnalyzer._run_slither)."""
+    slither = Slither(ContractRiskAnalyzer._compile(contract_file, compile_kwargs, artifact_key))
+    for detector_cls in SLITHER_DETECTORS:
+        slither.register_detector(detector_cls)
+    # run_detectors() trả về một list kết quả (dict JSON) cho mỗi detector
+    return [d for results in slither.run_detectors() for d in results]
+
+
+# Bộ nhớ đệm trong tiến trình, dùng chung giữa các instance (mỗi lần chạy tạo analyzer mới):
+# - phản hồi getsourcecode theo địa chỉ (chữ thường) -> (thời điểm lấy, dữ liệu); cùng thời hạn với
+#   file cache (xem Config.ETHERSCAN_CACHE_TTL*) và tối đa ETHERSCAN_MEMO_MAXSIZE mục
+# - kết quả Slither theo SHA-256 của mã nguồn + phiên bản Slither (hợp đồng triển khai lại cùng mã
+#   không cần phân tích lại); cũng được lưu ra data/slither_results/ để dùng lại giữa các lần chạy
+_source_memo = {}
+_source_memo_lock = threading.Lock()
+ETHERSCAN_MEMO_MAXSIZE = 10_000
+_internal_risk_memo = {}
+
 
 class ContractRiskAnalyzer:
     """
@@ -58,16 +177,102 @@ class ContractRiskAnalyzer:
         self.db = db
         self.api_key = Config.ETHERSCAN_API_KEY
         self.known_audited_contracts = self._load_known_audits()
+        # Kiểm tra phụ thuộc là tác vụ chờ mạng -> chạy song song, có giới hạn tốc độ
+        self._executor = ThreadPoolExecutor(max_workers=ETHERSCAN_MAX_WORKERS)
+        self._slither_executor = ThreadPoolExecutor(max_workers=SLITHER_MAX_WORKERS,
+                                                    thread_name_prefix="pillar1-slither")
+        self._rate_limiter = _RateLimiter(ETHERSCAN_MAX_RPS)
+        # Một Session dùng chung: giữ kết nối keep-alive tới Etherscan (không bắt tay TLS lại mỗi request)
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=10, pool_maxsize=10,
+            max_retries=Retry(total=5, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504],
+                              respect_retry_after_header=True)
+        )
+        self._session.mount('https://', adapter)
+        # Các tiến trình Slither (Pool 1 worker, "spawn") đang rảnh, dùng lại giữa các hợp đồng
+        self._slither_workers = queue.SimpleQueue()
+        # Import DataCache ở đây để tránh circular import
+        from analysis.data_cache import DataCache
+        self._cache = DataCache()
         print("[Pillar 1] Đã khởi tạo ContractRiskAnalyzer.")
 
-    def _load_known_audits(self) -> set:
+    def close(self):
+        """Dừng các executor và tiến trình Slither, đóng Session HTTP. Gọi khi không dùng analyzer nữa."""
+        self._executor.shutdown(wait=True)
+        self._slither_executor.shutdown(wait=True)
+        while True:
+            try:
+                self._slither_workers.get_nowait().terminate()
+            except queue.Empty:
+                break
+        self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _load_known_audits(self) -> frozenset:
         print("[Pillar 1] Đang tải danh sách hợp đồng đã kiểm toán...")
-        return {
-            "0xa0b86991c6218b36c1d19d4a2e9eb0ce3606eb48".lower(), # USDC 
-            "0xdac17f958d2ee523a2206206994597c13d831ec7".lower()  # Tether (USDT)
-        }
+        extra = []
+        if os.path.exists(KNOWN_AUDITED_REGISTRY):
+            try:
+                with open(KNOWN_AUDITED_REGISTRY, 'r', encoding='utf-8') as f:
+                    extra = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"[Pillar 1] ⚠️  Không đọc được {KNOWN_AUDITED_REGISTRY}: {e}")
+        # frozenset: bất biến, an toàn khi đọc từ nhiều luồng
+        return KNOWN_AUDITED_CONTRACTS | {addr.lower() for addr in extra}
+
+    def clear_cache(self):
+        """Xóa cache mã nguồn Etherscan và kết quả Slither (bộ nhớ và đĩa) cùng artifact biên dịch."""
+        with _source_memo_lock:
+            _source_memo.clear()
+        _internal_risk_memo.clear()
+        self._cache.clear_etherscan_sources()
+        shutil.rmtree(SLITHER_ARTIFACT_DIR, ignore_errors=True)
 
     def _fetch_source_code_direct(self, address: str):
+        """
+        Lấy mã nguồn verified của một địa chỉ: bộ nhớ trong tiến trình -> file cache -> API.
+        File cache hết hạn sau 7 ngày (1 ngày với proxy / chưa verified), xem Config.ETHERSCAN_CACHE_TTL*.
+        Chỉ phản hồi hợp lệ (status '1') mới được cache; lỗi mạng / rate limit được ném ra
+        (không cache) và sẽ được thử lại ở lần gọi sau.
+        Tắt cache bằng biến môi trường ETHERSCAN_CACHE=0.
+        """
+        if not Config.ETHERSCAN_CACHE_ENABLED:
+            return self._request_source_code(address)
+
+        key = address.lower()
+        with _source_memo_lock:
+            entry = _source_memo.get(key)
+        if entry is not None:
+            fetched_at, source_data = entry
+            ttl = self._cache.etherscan_source_ttl(source_data, Config.ETHERSCAN_CACHE_TTL,
+                                                   Config.ETHERSCAN_CACHE_TTL_MUTABLE)
+            if time.time() - fetched_at <= ttl:
+                return source_data
+
+        source_data = self._cache.load_etherscan_source(key, Config.ETHERSCAN_CACHE_TTL,
+                                                        Config.ETHERSCAN_CACHE_TTL_MUTABLE)
+        # Tuổi của bản trong bộ nhớ tính từ lúc ghi file, để không sống lâu hơn bản trên đĩa
+        fetched_at = self._cache.etherscan_source_saved_at(key) if source_data is not None else None
+        if source_data is None:
+            source_data = self._request_source_code(address)
+            if source_data is None:
+                return None
+            self._cache.save_etherscan_source(key, source_data)
+        with _source_memo_lock:
+            _source_memo.pop(key, None)
+            if len(_source_memo) >= ETHERSCAN_MEMO_MAXSIZE:
+                # dict giữ thứ tự chèn -> bỏ mục cũ nhất
+                del _source_memo[next(iter(_source_memo))]
+            _source_memo[key] = (fetched_at or time.time(), source_data)
+        return source_data
+
+    def _request_source_code(self, address: str):
         """
         Hàm gọi API trực tiếp để tránh lỗi thư viện.
         UPDATED: Sử dụng Etherscan API V2 (V1 deprecated Dec 2024)
@@ -82,20 +287,178 @@ class ContractRiskAnalyzer:
             "address": address,
             "apikey": self.api_key
         }
-        try:
-            response = requests.get(url, params=params, timeout=10)
+        # Lỗi mạng / HTTP (sau khi Retry của Session đã thử lại) và rate limit kéo dài được ném ra,
+        # KHÔNG trả về None: None chỉ dành cho "không có mã nguồn", tránh gắn nhầm cờ unverified
+        for attempt in range(ETHERSCAN_RATE_LIMIT_RETRIES + 1):
+            self._rate_limiter.acquire()
+            response = self._session.get(url, params=params, timeout=10)
+            response.raise_for_status()
             data = response.json()
-            if data.get('status') == '1' and data.get('result'):
-                return data['result'] # Trả về list chứa source code
-            else:
-                # Debug info
-                print(f" [API Info] V2 response status: {data.get('status')}, message: {data.get('message')}")
-                return None
+            rate_limited = data.get('status') == '0' and 'rate limit' in str(data.get('result', '')).lower()
+            if not rate_limited:
+                break
+            if attempt == ETHERSCAN_RATE_LIMIT_RETRIES:
+                raise RuntimeError(f"Etherscan rate limit sau {ETHERSCAN_RATE_LIMIT_RETRIES} lần thử lại: {data.get('result')}")
+            time.sleep(ETHERSCAN_BACKOFF_BASE * 2 ** attempt + random.random())
+        
+        if data.get('status') == '1' and data.get('result'):
+            return data['result'] # Trả về list chứa source code
+        if data.get('status') == '0':
+            # API key sai, địa chỉ không hợp lệ... -> lỗi API, không phải hợp đồng chưa verified
+            raise RuntimeError(f"Etherscan API lỗi: {data.get('message')} - {data.get('result')}")
+        # Debug info
+        print(f" [API Info] V2 response status: {data.get('status')}, message: {data.get('message')}")
+        return None
+
+    @staticmethod
+    def _solc_version(source_info: dict) -> str:
+        """Phiên bản solc (x.y.z) hợp đồng được biên dịch, lấy từ CompilerVersion; None nếu không xác định."""
+        match = SOLC_VERSION_PATTERN.match(source_info.get('CompilerVersion') or '')
+        return match.group(1) if match else None
+
+    @staticmethod
+    def _compile(contract_file: str, compile_kwargs: dict, artifact_key: str = None):
+        """
+        Biên dịch contract_file bằng crytic-compile. Có artifact_key thì dùng lại artifact đã
+        export (chưa quá SLITHER_ARTIFACT_TTL), ngược lại biên dịch rồi export để lần sau dùng lại.
+        """
+        if artifact_key is None:
+            return CryticCompile(contract_file, **compile_kwargs)
+        
+        artifact_dir = os.path.join(SLITHER_ARTIFACT_DIR, artifact_key)
+        try:
+            if time.time() - os.path.getmtime(artifact_dir) < SLITHER_ARTIFACT_TTL:
+                exported = sorted(f for f in os.listdir(artifact_dir) if f.endswith('.json'))
+                if exported:
+                    print(f" [Pillar 1-OS] Dùng lại artifact biên dịch: {artifact_dir}")
+                    return CryticCompile(os.path.join(artifact_dir, exported[0]))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            # Artifact hỏng / khác phiên bản crytic-compile -> biên dịch lại
+            print(f" [Pillar 1-OS] Không đọc được artifact cũ ({e}), biên dịch lại.")
+        
+        compilation = CryticCompile(contract_file, **compile_kwargs)
+        try:
+            shutil.rmtree(artifact_dir, ignore_errors=True)
+            compilation.export(export_format="standard", export_dir=artifact_dir)
         except Exception as e:
-            print(f" [API Error] Lỗi kết nối Etherscan: {e}")
-            return None
+            print(f" [Pillar 1-OS] Không lưu được artifact biên dịch: {e}")
+        return compilation
+
+    def _run_slither(self, contract_file: str, solc_version: str = None, working_dir: str = None,
+                     artifact_key: str = None) -> tuple:
+        """
+        Chạy toàn bộ detector của Slither trên một file .sol.
+        Dùng Slither dạng thư viện (trong tiến trình con dùng lại được, tối đa SLITHER_TIMEOUT giây)
+        nếu import được; không có thư viện thì gọi CLI `slither --json -`.
+        solc_version: ghim phiên bản solc qua solc-select (không phải dò pragma / tải lại compiler).
+        working_dir: thư mục chạy solc, để import dạng "@openzeppelin/..." trỏ tới các file đã ghi ra.
+        artifact_key: khóa cache artifact biên dịch (chỉ dùng với Slither dạng thư viện).
+        
+        Returns:
+            (danh sách detector dạng dict có 'impact'/'description', None) nếu thành công,
+            ([], dict kết quả mặc định kèm limitation) nếu thất bại
+        """
+        if Slither is not None:
+            kwargs = {"solc_solcs_select": solc_version} if solc_version else {}
+            if working_dir:
+                kwargs["solc_working_dir"] = working_dir
+            # Chạy trong tiến trình con để có thể cắt sau SLITHER_TIMEOUT (hợp đồng bệnh lý không treo
+            # luồng của _executor). Tiến trình được giữ lại cho hợp đồng sau (không import lại Slither);
+            # chỉ tiến trình bị quá thời gian mới bị hủy.
+            pool = self._get_slither_worker()
+            try:
+                detectors = pool.apply_async(_slither_detect, (contract_file, kwargs, artifact_key)).get(SLITHER_TIMEOUT)
+                self._slither_workers.put(pool)
+                return detectors, None
+            except multiprocessing.TimeoutError:
+                pool.terminate()
+                print(f" [Pillar 1-OS] ⚠️  LIMITATION: Slither chạy quá {SLITHER_TIMEOUT}s, đã dừng.")
+                return [], {
+                    "score": 50,  # Default moderate risk
+                    "is_default": True,  # FLAG: Đây là giả định
+                    "limitation": "SLITHER_TIMEOUT",
+                    "issues_found": [f"⚠️ LIMITATION: Slither analysis timed out after {SLITHER_TIMEOUT}s. Using default score."]
+                }
+            except Exception as e:
+                # Lỗi biên dịch / phân tích: tiến trình vẫn dùng được
+                self._slither_workers.put(pool)
+                stderr = str(e)
+        else:
+            result = subprocess.run(
+                ['slither', contract_file, '--json', '-', '--exclude-informational', '--exclude-optimization']
+                + (['--solc-working-dir', working_dir] if working_dir else []),
+                capture_output=True,
+                text=True,
+                timeout=SLITHER_TIMEOUT,
+                # solc-select đọc SOLC_VERSION để chọn compiler cho lệnh `solc`
+                env={**os.environ, "SOLC_VERSION": solc_version} if solc_version else None
+            )
+            stderr = result.stderr
+            if result.returncode == 0:
+                # Parse kết quả JSON từ Slither
+                try:
+                    slither_output = _json_loads(result.stdout)
+                except json.JSONDecodeError:  # orjson.JSONDecodeError là lớp con của lớp này
+                    print(f" [Pillar 1-OS] ⚠️  LIMITATION: Cannot parse Slither output.")
+                    return [], {
+                        "score": 50,
+                        "is_default": True,
+                        "limitation": "SLITHER_PARSE_ERROR",
+                        "issues_found": ["⚠️ LIMITATION: Slither output invalid. Using default score."]
+                    }
+                return slither_output.get('results', {}).get('detectors', []), None
+        
+        print(f" [Pillar 1-OS] ⚠️  LIMITATION: Slither analysis failed (missing Solidity compiler).")
+        print(f" [Pillar 1-OS] Error: {stderr[:200]}")
+        # Return default score với flag warning
+        return [], {
+            "score": 50,  # Default moderate risk
+            "is_default": True,  # FLAG: Đây là giả định
+            "limitation": "SLITHER_UNAVAILABLE",
+            "issues_found": [
+                f"⚠️ LIMITATION: Static analysis unavailable (requires solc compiler).",
+                f"Using default moderate risk score (50/100).",
+                f"For production: Install Solidity compiler to enable full analysis."
+            ]
+        }
+
+    def _get_slither_worker(self):
+        """Lấy một tiến trình Slither đang rảnh, hoặc tạo mới ("spawn": fork từ tiến trình nhiều luồng có thể deadlock)."""
+        try:
+            return self._slither_workers.get_nowait()
+        except queue.Empty:
+            return multiprocessing.get_context("spawn").Pool(1, maxtasksperchild=SLITHER_WORKER_MAX_TASKS)
+
+    @staticmethod
+    def _split_sources(source_code: str, contract_name: str) -> dict:
+        """
+        Tách trường SourceCode của Etherscan thành {đường dẫn tương đối: nội dung}:
+        - "{{...}}": Solidity standard JSON input (Etherscan bọc thêm một cặp ngoặc)
+        - "{...}": nhiều file dạng {"File.sol": {"content": ...}}
+        - còn lại: một file duy nhất
+        """
+        if source_code.startswith('{{'):
+            sources = _json_loads(source_code[1:-1]).get('sources', {})
+        elif source_code.startswith('{'):
+            parsed = _json_loads(source_code)
+            sources = parsed.get('sources', parsed)
+        else:
+            return {f"{contract_name}.sol": source_code}
+        return {name: data['content'] for name, data in sources.items()}
 
     def _get_internal_risk(self, contract_address: str) -> dict:
+        # Hợp đồng đã kiểm toán: không cần lấy mã nguồn và chạy Slither (mất 10-60s)
+        if contract_address.lower() in self.known_audited_contracts:
+            print(f"[Pillar 1-OS] {contract_address} nằm trong danh sách đã kiểm toán. Bỏ qua Slither.")
+            return {
+                "score": 0,  # Điểm RỦI RO: đã kiểm toán -> rủi ro nội tại thấp nhất
+                "is_default": False,
+                "source": "known_audited",
+                "issues_found": []
+            }
+
         print(f"[Pillar 1-OS] Đang lấy mã nguồn cho {contract_address}...")
         try:
             source_data = self._fetch_source_code_direct(contract_address)
@@ -116,56 +479,57 @@ class ContractRiskAnalyzer:
             
             print(f" [Pillar 1-OS] Đã lấy mã nguồn hợp đồng: {contract_name}")
             
+            source_hash = hashlib.sha256(source_code.encode('utf-8')).hexdigest()
+            result_key = f"{source_hash}_{SLITHER_VERSION}"
+            if Config.SLITHER_CACHE_ENABLED:
+                cached_result = _internal_risk_memo.get(result_key) or self._cache.load_slither_result(result_key)
+                if cached_result is not None:
+                    print(f" [Pillar 1-OS] Mã nguồn đã được phân tích trước đó, dùng lại kết quả Slither.")
+                    _internal_risk_memo[result_key] = cached_result
+                    return dict(cached_result)
+            
             # Tạo thư mục tạm để lưu source code
-            temp_dir = tempfile.mkdtemp()
+            temp_dir = tempfile.mkdtemp(prefix="pillar1_", dir=SOURCE_TMP_DIR)
             print(f" [Pillar 1-OS] Đã tạo thư mục tạm: {temp_dir}")
             
             try:
-                # Lưu source code vào file .sol
-                contract_file = os.path.join(temp_dir, f"{contract_name}.sol")
-                
-                # Xử lý trường hợp source code là JSON (multi-file)
-                if source_code.startswith('{{'):
-                    source_code = source_code[1:-1]  # Remove outer braces
-                    
-                with open(contract_file, 'w') as f:
-                    f.write(source_code)
+                # Lưu source code vào các file .sol (giữ cấu trúc thư mục của multi-file)
+                files_to_write = self._split_sources(source_code, contract_name)
+                # Khớp nguyên tên: "contract Token" không được khớp "contract TokenBase"
+                main_contract = re.compile(rf"\bcontract\s+{re.escape(contract_name)}\b")
+                contract_file = None
+                created_dirs = {temp_dir}
+                for file_name, content in files_to_write.items():
+                    file_path = os.path.normpath(os.path.join(temp_dir, file_name))
+                    if not file_path.startswith(temp_dir + os.sep):
+                        # Đường dẫn tuyệt đối / "../" -> chỉ giữ tên file, không ghi ra ngoài thư mục tạm
+                        file_path = os.path.join(temp_dir, os.path.basename(file_name))
+                    # Mỗi thư mục con chỉ makedirs một lần (nhiều file thường chung thư mục, vd. contracts/)
+                    parent_dir = os.path.dirname(file_path)
+                    if parent_dir not in created_dirs:
+                        os.makedirs(parent_dir, exist_ok=True)
+                        created_dirs.add(parent_dir)
+                    # Mã hóa một lần rồi ghi bytes thẳng bằng os.write (bỏ qua lớp text I/O)
+                    fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+                    try:
+                        os.write(fd, content.encode('utf-8'))
+                    finally:
+                        os.close(fd)
+                    # Slither phân tích file khai báo hợp đồng chính (các file khác được import)
+                    if contract_file is None and main_contract.search(content):
+                        contract_file = file_path
+                if contract_file is None:
+                    contract_file = file_path
                 
                 # Chạy Slither để phân tích
                 print(f" [Pillar 1-OS] Đang chạy Slither...")
-                result = subprocess.run(
-                    ['slither', contract_file, '--json', '-'],
-                    capture_output=True,
-                    text=True,
-                    timeout=60
-                )
-                
-                if result.returncode != 0:
-                    print(f" [Pillar 1-OS] ⚠️  LIMITATION: Slither analysis failed (missing Solidity compiler).")
-                    print(f" [Pillar 1-OS] Error: {result.stderr[:200]}")
-                    # Return default score với flag warning
-                    return {
-                        "score": 50,  # Default moderate risk
-                        "is_default": True,  # FLAG: Đây là giả định
-                        "limitation": "SLITHER_UNAVAILABLE",
-                        "issues_found": [
-                            f"⚠️ LIMITATION: Static analysis unavailable (requires solc compiler).",
-                            f"Using default moderate risk score (50/100).",
-                            f"For production: Install Solidity compiler to enable full analysis."
-                        ]
-                    }
-                
-                # Parse kết quả JSON từ Slither
-                try:
-                    slither_output = json.loads(result.stdout)
-                except json.JSONDecodeError:
-                    print(f" [Pillar 1-OS] ⚠️  LIMITATION: Cannot parse Slither output.")
-                    return {
-                        "score": 50,
-                        "is_default": True,
-                        "limitation": "SLITHER_PARSE_ERROR",
-                        "issues_found": ["⚠️ LIMITATION: Slither output invalid. Using default score."]
-                    }
+                solc_version = self._solc_version(source_data[0])
+                artifact_key = (f"{source_hash[:32]}_{solc_version or 'auto'}"
+                                if Config.SLITHER_CACHE_ENABLED else None)
+                detectors, failure = self._run_slither(contract_file, solc_version,
+                                                       working_dir=temp_dir, artifact_key=artifact_key)
+                if failure is not None:
+                    return failure
                 
                 # Đếm số lượng issues theo mức độ nghiêm trọng
                 high_issues = 0
@@ -173,7 +537,7 @@ class ContractRiskAnalyzer:
                 low_issues = 0
                 issues_found = []
                 
-                for detector in slither_output.get('results', {}).get('detectors', []):
+                for detector in detectors:
                     impact = detector.get('impact', '').lower()
                     description = detector.get('description', 'Unknown issue')
                     
@@ -194,7 +558,7 @@ class ContractRiskAnalyzer:
                 print(f" [Pillar 1-OS] ✅ Slither analysis complete: {high_issues}H, {medium_issues}M, {low_issues}L")
                 print(f" [Pillar 1-OS] Internal Risk Score: {risk_score}/100")
                 
-                return {
+                result = {
                     "score": risk_score,
                     "is_default": False,  # ✅ Real analysis
                     "high_issues": high_issues,
@@ -202,6 +566,11 @@ class ContractRiskAnalyzer:
                     "low_issues": low_issues,
                     "issues_found": issues_found[:10]
                 }
+                # Chỉ ghi nhớ kết quả phân tích thật (không ghi nhớ điểm mặc định khi Slither lỗi)
+                if Config.SLITHER_CACHE_ENABLED:
+                    _internal_risk_memo[result_key] = result
+                    self._cache.save_slither_result(result_key, result)
+                return dict(result)
                 
             finally:
                 shutil.rmtree(temp_dir)
@@ -216,134 +585,109 @@ class ContractRiskAnalyzer:
                 "issues_found": [f"⚠️ LIMITATION: {str(e)}. Using default score."]
             }
 
-            # Xử lý Source Code (Solidity standard JSON input, Single file)
-            if source_code.startswith('{{'):
-                 source_code_json = json.loads(source_code[1:-1])
-                 files_to_write = source_code_json.get('sources', {})
-            elif source_code.startswith('{'):
-                 source_code_json = json.loads(source_code)
-                 files_to_write = source_code_json
-            else:
-                 files_to_write = {f"{contract_name}.sol": {"content": source_code}}
-
-        except Exception as e:
-            print(f" [Pillar 1-OS] Lỗi khi xử lý mã nguồn: {e}")
-            return {"score": 50, "issues_found": [f"Source process error: {e}"]}
-
-        temp_dir = tempfile.mkdtemp()
-        print(f" [Pillar 1-OS] Đã tạo thư mục tạm: {temp_dir}")
-        try:
-            for file_name, data in files_to_write.items():
-                # Xử lý đường dẫn file an toàn
-                safe_name = os.path.basename(file_name) 
-                file_path = os.path.join(temp_dir, safe_name)
-                
-                # Nếu file nằm trong thư mục con (vd: contracts/Token.sol)
-                if os.path.dirname(file_name):
-                    os.makedirs(os.path.join(temp_dir, os.path.dirname(file_name)), exist_ok=True)
-                    file_path = os.path.join(temp_dir, file_name)
-                
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(data['content'])
-
-            json_output_file = os.path.join(temp_dir, 'slither_results.json')
-            print(f" [Pillar 1-OS] Đang chạy Slither...")
-            
-            # Chạy Slither
-            command = ['slither', temp_dir, '--json', json_output_file]
-            process = subprocess.run(command, capture_output=True, text=True, timeout=120)
-
-            if process.returncode != 0 and not os.path.exists(json_output_file):
-                print(f" [Pillar 1-OS] Slither thất bại. Lỗi:\n{process.stderr[:200]}...")
-                return {"score": 50, "issues_found": ["Slither execution failed"]}
-
-            if not os.path.exists(json_output_file):
-                print(f" [Pillar 1-OS] Slither chạy nhưng không tạo file JSON.")
-                return {"score": 50, "issues_found": ["Slither JSON output not found"]}
-
-            with open(json_output_file, 'r') as f:
-                results = json.load(f)
-
-            if results.get('success', False) and 'results' in results:
-                issues = results['results'].get('detectors', [])
-                print(f" [Pillar 1-OS] Slither hoàn tất. Phát hiện {len(issues)} vấn đề.")
-                score = max(0, 100 - (len(issues) * 5)) 
-                return {"score": score, "issues_found": [i['description'] for i in issues]}
-            else:
-                print(f" [Pillar 1-OS] Slither hoàn tất (không vấn đề hoặc JSON lạ).")
-                return {"score": 100, "issues_found": []}
+    def _get_dependency_graph(self, contract_address: str) -> dict:
+        return self._get_dependency_graphs([contract_address])[contract_address]
 
-        except Exception as e:
-            print(f" [Pillar 1-OS] Lỗi Runtime Slither: {e}")
-            return {"score": 50, "issues_found": [f"Slither runtime error: {e}"]}
+    def _get_dependency_graphs(self, contract_addresses: list) -> dict:
+        """
+        Xây dựng đồ thị phụ thuộc cho nhiều hợp đồng bằng MỘT truy vấn BigQuery
+        (một job quét các partition 90 ngày một lần thay vì mỗi hợp đồng một job).
+        Đồ thị là danh sách kề {hợp đồng gốc: [địa chỉ được gọi (chữ thường), ...]}.
         
-        finally:
-            if os.path.exists(temp_dir):
-                shutil.rmtree(temp_dir)
-                print(f" [Pillar 1-OS] Đã dọn dẹp thư mục tạm.")
-
-    def _get_dependency_graph(self, contract_address: str) -> nx.DiGraph:
-        print(f"[Pillar 1] Đang xây dựng đồ thị phụ thuộc cho {contract_address}...")
-        G = nx.DiGraph()
-        G.add_node(contract_address, audited=(contract_address in self.known_audited_contracts))
+        Returns:
+            Dict {địa chỉ như đầu vào: đồ thị}; lỗi truy vấn -> đồ thị không có phụ thuộc
+        """
+        print(f"[Pillar 1] Đang xây dựng đồ thị phụ thuộc cho {', '.join(contract_addresses)}...")
+        addr_of = {addr.lower(): addr for addr in contract_addresses}
+        deps_of = {}
         
         # Truy vấn lấy 90 ngày gần nhất để tiết kiệm
-        query = f"""
+        # SQL cố định, địa chỉ truyền qua tham số @addrs (không nối chuỗi)
+        # Tối đa 30 phụ thuộc cho mỗi hợp đồng (như LIMIT 30 khi truy vấn từng hợp đồng)
+        query = """
             SELECT 
+                from_address,
                 to_address
             FROM `bigquery-public-data.crypto_ethereum.traces`
-            WHERE from_address = '{contract_address.lower()}'
-              AND (call_type = 'delegatecall' OR call_type = 'call')
-              AND to_address != '{contract_address.lower()}'
+            WHERE from_address IN UNNEST(@addrs)
+              AND call_type IN ('delegatecall', 'call')
+              AND to_address != from_address
               AND status = 1
-              AND DATE(block_timestamp) >= DATE_SUB(CURRENT_DATE(), INTERVAL 90 DAY)
-            GROUP BY 1
-            LIMIT 30
+              -- So sánh trực tiếp cột partition (không bọc DATE()) để BigQuery cắt partition
+              AND block_timestamp >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL 90 DAY)
+            GROUP BY 1, 2
+            QUALIFY ROW_NUMBER() OVER (PARTITION BY from_address) <= 30
         """
+        parameters = [bigquery.ArrayQueryParameter("addrs", "STRING", list(addr_of))]
         try:
-            df = self.db.query_to_dataframe(query)
-            if df.empty:
+            # Kết quả nhỏ (≤30 dòng mỗi hợp đồng) -> duyệt thẳng các Row, không dựng DataFrame
+            rows = self.db.query_rows(query, parameters=parameters)
+            if not rows:
                 print("[Pillar 1] Không tìm thấy phụ thuộc (traces) nào trong 90 ngày gần nhất.")
-                return G
-            
-            for _, row in df.iterrows():
-                dep_address = row['to_address'].lower()
-                is_audited = (dep_address in self.known_audited_contracts)
-                G.add_node(dep_address, audited=is_audited)
-                G.add_edge(contract_address, dep_address)
-                
-            print(f"[Pillar 1] Xây dựng đồ thị thành công, tìm thấy {len(df)} phụ thuộc.")
-            return G
-            
+            else:
+                for row in rows:
+                    deps_of.setdefault(row['from_address'].lower(), []).append(row['to_address'].lower())
+                print(f"[Pillar 1] Xây dựng đồ thị thành công, tìm thấy {len(rows)} phụ thuộc.")
         except Exception as e:
             print(f"[Pillar 1] Lỗi khi truy vấn traces: {e}")
-            return G
+        
+        return {addr: {addr: deps_of.get(key, [])} for key, addr in addr_of.items()}
 
-    def _analyze_hidden_risks(self, graph: nx.DiGraph) -> list:
+    def _analyze_hidden_risks(self, graph: dict) -> list:
         hidden_risks = []
-        if graph.number_of_nodes() <= 1:
+        if not any(graph.values()):
             return hidden_risks
-            
-        for node in graph.nodes():
-            if node == list(graph.nodes())[0]: 
-                continue
-            
-            is_audited = graph.nodes[node].get('audited', False)
-            if not is_audited:
-                try:
-                    source = self._fetch_source_code_direct(node)
-                    if not source or not source[0].get('SourceCode'):
-                        risk = f"Phụ thuộc vào hợp đồng CHƯA XÁC THỰC (unverified): {node}"
-                        hidden_risks.append(risk)
-                        print(f"[Pillar 1] RỦI RO: {risk}")
-                except Exception:
-                    risk = f"Lỗi khi kiểm tra phụ thuộc: {node}"
+
+        # Gom các hợp đồng phụ thuộc chưa kiểm toán rồi kiểm tra mã nguồn song song
+        # (getsourcecode của Etherscan chỉ nhận 1 địa chỉ mỗi request)
+        audited = self.known_audited_contracts
+        unaudited = [dep for deps in graph.values() for dep in deps if dep not in audited]
+        futures = [self._executor.submit(self._fetch_source_code_direct, node) for node in unaudited]
+
+        for node, future in zip(unaudited, futures):
+            try:
+                source = future.result()
+                if not source or not source[0].get('SourceCode'):
+                    risk = f"Phụ thuộc vào hợp đồng CHƯA XÁC THỰC (unverified): {node}"
                     hidden_risks.append(risk)
+                    print(f"[Pillar 1] RỦI RO: {risk}")
+            except Exception as e:
+                risk = f"Lỗi khi kiểm tra phụ thuộc: {node}"
+                hidden_risks.append(risk)
+                print(f"[Pillar 1] {risk} ({e})")
 
         print(f"[Pillar 1] Phân tích rủi ro phụ thuộc hoàn tất. Tìm thấy {len(hidden_risks)} rủi ro.")
         return hidden_risks
 
-    def run(self, contract_address: str, use_cache: bool = False, save_cache: bool = True) -> dict:
+    @staticmethod
+    def _score(internal_risk: dict, dependency_graph: dict, hidden_risks: list) -> dict:
+        """Tính điểm rủi ro tổng hợp từ kết quả Slither và các rủi ro phụ thuộc."""
+        # Tính toán Internal Risk Score
+        # Nếu không có mã nguồn hoặc lỗi, score mặc định = 50 (tương đương 0.50 sau khi chia 100)
+        internal_score = internal_risk.get('score', 50) / 100.0
+        
+        # Tính toán Dependency Risk Score
+        # Công thức: min(Số rủi ro, 5) / 5.0 để giới hạn điểm tối đa ở 1.0
+        dependency_risk_count = len(hidden_risks)
+        dependency_risk_score = min(dependency_risk_count, DEPENDENCY_RISK_CAP) / DEPENDENCY_RISK_CAP
+        
+        # Tính toán Final Risk Score với trọng số:
+        # Internal (0.4) + Dependency (0.6) = 1.0
+        # Xem docstring của class để hiểu lý do trọng số này.
+        final_risk_score = (internal_score * 0.4) + (dependency_risk_score * 0.6)
+        
+        print(f" [Pillar 1] Hoàn tất. Điểm rủi ro nội bộ: {internal_score:.2f}, Điểm rủi ro phụ thuộc: {dependency_risk_score:.2f}")
+        print(f" [Pillar 1] Điểm rủi ro cuối cùng (0.4*Internal + 0.6*Dependency): {final_risk_score:.2f}")
+        
+        return {
+            "final_risk_score": final_risk_score,
+            "internal_risk": internal_risk,
+            "dependency_risks": hidden_risks,
+            "dependency_graph_nodes": [node for root, deps in dependency_graph.items() for node in (root, *deps)]
+        }
+
+    def run(self, contract_address: str, use_cache: bool = False, save_cache: bool = True,
+            skip_slither_if_dep_saturated: bool = False) -> dict:
         """
         Chạy phân tích Pillar 1: Rủi ro Hợp đồng.
         
@@ -351,6 +695,10 @@ class ContractRiskAnalyzer:
             contract_address: Địa chỉ hợp đồng cần phân tích
             use_cache: Nếu True, sẽ đọc từ cache nếu có, không query lại
             save_cache: Nếu True, sẽ lưu kết quả vào cache sau khi phân tích
+            skip_slither_if_dep_saturated: Nếu True, kiểm tra phụ thuộc trước và bỏ qua Slither khi
+                Dependency Risk Score đã bão hòa (>= DEPENDENCY_RISK_CAP phụ thuộc rủi ro); khi đó
+                Internal Risk dùng điểm mặc định 50 (Final Risk Score = 0.8; với Slither
+                điểm cũng chỉ nằm trong khoảng 0.6-1.0)
             
         Returns:
             Dictionary chứa kết quả phân tích rủi ro
@@ -368,33 +716,28 @@ class ContractRiskAnalyzer:
                 return cached_result
         
         print("\n--- Bắt đầu Phân tích Pillar 1: Rủi ro Hợp đồng ---")
-        internal_risk = self._get_internal_risk(contract_address)
+        # Slither (CPU cục bộ) chạy nền trong lúc truy vấn BigQuery và kiểm tra phụ thuộc (mạng);
+        # hai nhánh không dùng chung dữ liệu cho đến bước tính điểm
+        # (trừ khi chọn bỏ qua Slither: khi đó phải biết kết quả phụ thuộc trước)
+        internal_future = (None if skip_slither_if_dep_saturated
+                           else self._slither_executor.submit(self._get_internal_risk, contract_address))
         dependency_graph = self._get_dependency_graph(contract_address)
         hidden_risks = self._analyze_hidden_risks(dependency_graph)
         
-        # Tính toán Internal Risk Score
-        # Nếu không có mã nguồn hoặc lỗi, score mặc định = 50 (tương đương 0.50 sau khi chia 100)
-        internal_score = internal_risk.get('score', 50) / 100.0
-        
-        # Tính toán Dependency Risk Score
-        # Công thức: min(Số rủi ro, 5) / 5.0 để giới hạn điểm tối đa ở 1.0
-        dependency_risk_count = len(hidden_risks)
-        dependency_risk_score = min(dependency_risk_count, 5) / 5.0
-        
-        # Tính toán Final Risk Score với trọng số:
-        # Internal (0.4) + Dependency (0.6) = 1.0
-        # Xem docstring của class để hiểu lý do trọng số này.
-        final_risk_score = (internal_score * 0.4) + (dependency_risk_score * 0.6)
-        
-        print(f" [Pillar 1] Hoàn tất. Điểm rủi ro nội bộ: {internal_score:.2f}, Điểm rủi ro phụ thuộc: {dependency_risk_score:.2f}")
-        print(f" [Pillar 1] Điểm rủi ro cuối cùng (0.4*Internal + 0.6*Dependency): {final_risk_score:.2f}")
+        if internal_future is not None:
+            internal_risk = internal_future.result()
+        elif len(hidden_risks) >= DEPENDENCY_RISK_CAP:
+            print(f" [Pillar 1] Rủi ro phụ thuộc đã bão hòa ({len(hidden_risks)} rủi ro), bỏ qua Slither.")
+            internal_risk = {
+                "score": 50,
+                "is_default": True,
+                "limitation": "SKIPPED_DEPENDENCY_SATURATED",
+                "issues_found": ["⚠️ LIMITATION: Static analysis skipped (dependency risk saturated). Using default score."]
+            }
+        else:
+            internal_risk = self._get_internal_risk(contract_address)
         
-        result = {
-            "final_risk_score": final_risk_score,
-            "internal_risk": internal_risk,
-            "dependency_risks": hidden_risks,
-            "dependency_graph_nodes": list(dependency_graph.nodes())
-        }
+        result = self._score(internal_risk, dependency_graph, hidden_risks)
         
         # Lưu vào cache nếu được yêu cầu
         if save_cache:
@@ -402,3 +745,47 @@ class ContractRiskAnalyzer:
         
         return result
 
+
+    def run_batch(self, contract_addresses: list, use_cache: bool = False, save_cache: bool = True) -> dict:
+        """
+        Chạy phân tích Pillar 1 cho nhiều hợp đồng, dùng MỘT truy vấn BigQuery cho toàn bộ đồ thị phụ thuộc.
+        
+        Args:
+            contract_addresses: Danh sách địa chỉ hợp đồng cần phân tích
+            use_cache: Nếu True, hợp đồng nào đã có cache thì đọc từ cache
+            save_cache: Nếu True, sẽ lưu kết quả từng hợp đồng vào cache
+            
+        Returns:
+            Dict {địa chỉ hợp đồng: kết quả như run()}
+        """
+        # Import DataCache ở đây để tránh circular import
+        from analysis.data_cache import DataCache
+        
+        cache = DataCache()
+        results = {}
+        pending = []
+        for contract_address in dict.fromkeys(contract_addresses):
+            cached_result = cache.load_pillar1(contract_address) if use_cache else None
+            if cached_result is not None:
+                results[contract_address] = cached_result
+            else:
+                pending.append(contract_address)
+        
+        if results:
+            print(f"[Pillar 1] Đã sử dụng dữ liệu từ cache cho {len(results)} hợp đồng.")
+        if not pending:
+            return results
+        
+        print(f"\n--- Bắt đầu Phân tích Pillar 1 cho {len(pending)} hợp đồng ---")
+        # Slither chạy trên executor riêng: kiểm tra phụ thuộc (self._executor) không bị xếp hàng phía sau
+        internal_futures = {addr: self._slither_executor.submit(self._get_internal_risk, addr) for addr in pending}
+        dependency_graphs = self._get_dependency_graphs(pending)
+        for contract_address in pending:
+            dependency_graph = dependency_graphs[contract_address]
+            hidden_risks = self._analyze_hidden_risks(dependency_graph)
+            result = self._score(internal_futures[contract_address].result(), dependency_graph, hidden_risks)
+            if save_cache:
+                cache.save_pillar1(contract_address, result)
+            results[contract_address] = result
+        
+        return results
@@ -147,13 +147,16 @@ class GasCostForecaster:
             # order=(1,1,1): ARIMA parameters (p,d,q)
             # seasonal_order=(1,1,1,24): Seasonal ARIMA parameters (P,D,Q,s)
             #   s=24: 24-hour cycle (daily seasonality)
+            # concentrate_scale=True: sigma² được tính trực tiếp (profile likelihood) thay vì tối ưu,
+            #   bớt 1 tham số -> mỗi gradient số cần ít lần chạy Kalman filter hơn.
             model = SARIMAX(
                 endog_data,
                 exog=exog_data,
                 order=(1, 1, 1),
                 seasonal_order=(1, 1, 1, 24),
                 enforce_stationarity=False,
-                enforce_invertibility=False
+                enforce_invertibility=False,
+                concentrate_scale=True
             )
             self.model_fit = model.fit(disp=False, maxiter=200)
             print("[Pillar 2] Huấn luyện mô hình SARIMAX hoàn tất.")
@@ -217,7 +220,8 @@ class GasCostForecaster:
                     order=(1, 1, 1),
                     seasonal_order=(1, 1, 1, 24),
                     enforce_stationarity=False,
-                    enforce_invertibility=False
+                    enforce_invertibility=False,
+                    concentrate_scale=True
                 )
                 model_fit = model.fit(disp=False, maxiter=100)
                 
@@ -361,7 +365,8 @@ class GasCostForecaster:
                 order=(1, 1, 1),
                 seasonal_order=(1, 1, 1, 24),
                 enforce_stationarity=False,
-                enforce_invertibility=False
+                enforce_invertibility=False,
+                concentrate_scale=True
             )
             model_fit_val = model_val.fit(disp=False, maxiter=100)
             
@@ -611,6 +616,7 @@ class GasCostForecaster:
         print(f"[Pillar 2] Hoàn tất. Cửa sổ 4 giờ rẻ nhất bắt đầu lúc: {best_window_start} UTC")
         
         result = {
+            # Định dạng str(Timestamp): 'YYYY-MM-DD HH:MM:SS' (AnalysisService đọc giờ ở vị trí [11:13])
             "best_window_start_utc": str(best_window_start),
             "estimated_avg_gwei": best_gas,
             "forecast_dataframe": forecast_df
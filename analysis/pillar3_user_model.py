@@ -1,10 +1,14 @@
 # analysis/pillar3_user_model.py
 import pandas as pd
+import numpy as np
 from connectors.db_connector import BigQueryConnector
 from sklearn.cluster import DBSCAN
 from sklearn.preprocessing import StandardScaler
 from core.config import Config
 
+# Số luồng tối đa cho DBSCAN (giới hạn để không chiếm hết CPU khi các trụ cột chạy song song)
+DBSCAN_N_JOBS = 2
+
 class UserBehaviorAnalyzer:
     """
     Triển khai Trụ cột 3: Phân tích Hành vi Người dùng.
@@ -66,7 +70,7 @@ class UserBehaviorAnalyzer:
         if features_df.empty:
             return {"total_clusters": 0, "clusters": {}}
 
-        X = features_df[['funding_source_id', 'creation_timestamp']]
+        X = features_df[['funding_source_id', 'creation_timestamp']].to_numpy(dtype=np.float64)
         
         # Khớp với luồng: StandardScaler().fit_transform()
         scaler = StandardScaler()
@@ -75,7 +79,9 @@ class UserBehaviorAnalyzer:
         # Khớp với luồng: DBSCAN(eps=0.5, min_samples=3)
         dynamic_min_samples = 2 if len(wallet_list) < 3 else 3
         print(f"[Pillar 3] Chạy DBSCAN với eps=0.5, min_samples={dynamic_min_samples}")
-        dbscan = DBSCAN(eps=0.5, min_samples=dynamic_min_samples)
+        # n_jobs: truy vấn láng giềng (phần tốn thời gian nhất) chạy song song, nhưng có giới hạn -
+        # 3 trụ cột đã chạy song song trong AnalysisService, dùng mọi CPU ở đây sẽ tranh CPU với chúng
+        dbscan = DBSCAN(eps=0.5, min_samples=dynamic_min_samples, n_jobs=DBSCAN_N_JOBS)
         clusters = dbscan.fit_predict(X_scaled)
         
         features_df['cluster'] = clusters
@@ -313,8 +313,10 @@ class VisualizationService:
                     transform=ax2.transAxes)
             ax2.set_title('Sybil Analysis', fontsize=12, fontweight='bold')
         
-        # 3. Cohort Retention Analysis
-        ax3 = axes[1, :]
+        # 3. Cohort Retention Analysis (chiếm cả hàng dưới)
+        for ax in axes[1, :]:
+            ax.remove()
+        ax3 = fig.add_subplot(2, 1, 2)
         cohort_df = user_data.get('cohort_analysis')
         if cohort_df is not None and isinstance(cohort_df, pd.DataFrame) and not cohort_df.empty:
             # Tính retention rates
@@ -22,48 +22,86 @@ class BigQueryConnector:
             print(f"[Connector] Lỗi kết nối BigQuery: {e}")
             self.client = None
 
-    def query_to_dataframe(self, sql_query: str) -> pd.DataFrame:
+    def _run_query(self, sql_query: str, parameters: list = None):
+        """
+        Kiểm tra chi phí bằng dry run rồi chạy truy vấn thật.
+        Trả về RowIterator của BigQuery; ném Exception nếu vượt ngưỡng an toàn hoặc lỗi truy vấn.
+        """
+        # === BƯỚC 1: KIỂM TRA CHI PHÍ (DRY RUN) ===
+        query_parameters = parameters or []
+        job_config = bigquery.QueryJobConfig(dry_run=True, use_query_cache=False, use_legacy_sql=False,
+                                             query_parameters=query_parameters)
+        dry_run_job = self.client.query(sql_query, job_config=job_config)
+        
+        bytes_to_scan = dry_run_job.total_bytes_processed
+        gb_to_scan = bytes_to_scan / (1024**3) # Đổi sang GB
+        
+        print(f"[Connector] ƯỚC TÍNH TRUY VẤN: Sẽ quét {gb_to_scan:.4f} GB.")
+        
+        # === CẦU DAO AN TOÀN: Đặt giới hạn 800GB (dưới 1TB) ===
+        SAFETY_LIMIT_GB = 800
+        
+        if gb_to_scan > SAFETY_LIMIT_GB:
+            error_msg = (
+                f"!!! CẢNH BÁO NGHIÊM TRỌNG: Truy vấn này ước tính quét {gb_to_scan:.4f} GB, "
+                f"vượt quá ngưỡng an toàn {SAFETY_LIMIT_GB} GB. HỦY BỎ ĐỂ BẢO VỆ TÀI KHOẢN."
+            )
+            print(error_msg)
+            raise Exception(error_msg)
+        
+        if gb_to_scan == 0:
+            print("[Connector] Ước tính 0 GB (có thể là DDL hoặc đã cache), tiếp tục chạy.")
+
+        # === BƯỚC 2: CHẠY TRUY VẤN THẬT (VÌ ĐÃ AN TOÀN) ===
+        print(f"[Connector] Đang thực thi truy vấn...")
+        # maximum_bytes_billed: BigQuery tự hủy job nếu thực tế quét vượt ngưỡng an toàn
+        # (phòng khi ước tính dry run thấp hơn thực tế)
+        run_config = bigquery.QueryJobConfig(
+            use_query_cache=True,
+            use_legacy_sql=False,
+            query_parameters=query_parameters,
+            maximum_bytes_billed=SAFETY_LIMIT_GB * 1024**3,
+        )
+        query_job = self.client.query(sql_query, job_config=run_config) # Chạy truy vấn thật
+        return query_job.result()  # Chờ kết quả
+
+    def query_to_dataframe(self, sql_query: str, parameters: list = None) -> pd.DataFrame:
         """
         Thực thi một truy vấn SQL thô và trả về kết quả
         dưới dạng một Pandas DataFrame.
         *** CÓ TÍCH HỢP KIỂM TRA DRY RUN ĐỂ TRÁNH TỐN KÉM ***
+        
+        parameters: danh sách bigquery.ScalarQueryParameter/ArrayQueryParameter cho các
+        placeholder @ten trong SQL. SQL cố định + tham số giúp tránh SQL injection và cho phép
+        dùng lại kết quả cache 24h của BigQuery khi tham số giống nhau.
         """
         if not self.client:
             print("[Connector] Không thể truy vấn, client chưa được khởi tạo.")
             return pd.DataFrame()
             
         try:
-            # === BƯỚC 1: KIỂM TRA CHI PHÍ (DRY RUN) ===
-            job_config = bigquery.QueryJobConfig(dry_run=True, use_query_cache=False)
-            dry_run_job = self.client.query(sql_query, job_config=job_config)
-            
-            bytes_to_scan = dry_run_job.total_bytes_processed
-            gb_to_scan = bytes_to_scan / (1024**3) # Đổi sang GB
-            
-            print(f"[Connector] ƯỚC TÍNH TRUY VẤN: Sẽ quét {gb_to_scan:.4f} GB.")
-            
-            # === CẦU DAO AN TOÀN: Đặt giới hạn 800GB (dưới 1TB) ===
-            SAFETY_LIMIT_GB = 800
-            
-            if gb_to_scan > SAFETY_LIMIT_GB:
-                error_msg = (
-                    f"!!! CẢNH BÁO NGHIÊM TRỌNG: Truy vấn này ước tính quét {gb_to_scan:.4f} GB, "
-                    f"vượt quá ngưỡng an toàn {SAFETY_LIMIT_GB} GB. HỦY BỎ ĐỂ BẢO VỆ TÀI KHOẢN."
-                )
-                print(error_msg)
-                raise Exception(error_msg)
-            
-            if gb_to_scan == 0:
-                print("[Connector] Ước tính 0 GB (có thể là DDL hoặc đã cache), tiếp tục chạy.")
-
-            # === BƯỚC 2: CHẠY TRUY VẤN THẬT (VÌ ĐÃ AN TOÀN) ===
-            print(f"[Connector] Đang thực thi truy vấn...")
-            query_job = self.client.query(sql_query) # Chạy truy vấn thật
-            results = query_job.result()  # Chờ kết quả
-            df = results.to_dataframe()
+            df = self._run_query(sql_query, parameters).to_dataframe()
             print(f"[Connector] Truy vấn thành công, trả về {len(df)} dòng.")
             return df
             
         except Exception as e:
             print(f"[Connector] Lỗi truy vấn (hoặc bị hủy do dry run): {e}")
-            return pd.DataFrame()
\ No newline at end of file
+            return pd.DataFrame()
+
+    def query_rows(self, sql_query: str, parameters: list = None) -> list:
+        """
+        Giống query_to_dataframe nhưng trả về danh sách bigquery.Row (truy cập row['cot']),
+        không dựng DataFrame. Dùng cho các kết quả nhỏ chỉ cần duyệt qua một lần.
+        """
+        if not self.client:
+            print("[Connector] Không thể truy vấn, client chưa được khởi tạo.")
+            return []
+            
+        try:
+            rows = list(self._run_query(sql_query, parameters))
+            print(f"[Connector] Truy vấn thành công, trả về {len(rows)} dòng.")
+            return rows
+            
+        except Exception as e:
+            print(f"[Connector] Lỗi truy vấn (hoặc bị hủy do dry run): {e}")
+            return []
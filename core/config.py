@@ -18,6 +18,18 @@ class Config:
     
     GOOGLE_APPLICATION_CREDENTIALS = os.environ.get("GOOGLE_APPLICATION_CREDENTIALS_PATH")
     
+    # Cache phản hồi getsourcecode của Etherscan (data/etherscan/)
+    # Đặt ETHERSCAN_CACHE=0 để luôn gọi API
+    ETHERSCAN_CACHE_ENABLED = os.environ.get("ETHERSCAN_CACHE", "1") != "0"
+    # Mã nguồn đã verified gần như bất biến -> giữ 7 ngày;
+    # proxy (implementation có thể đổi) hoặc chưa verified (có thể được verify sau) -> 1 ngày
+    ETHERSCAN_CACHE_TTL = 7 * 24 * 60 * 60  # giây
+    ETHERSCAN_CACHE_TTL_MUTABLE = 24 * 60 * 60  # giây
+    
+    # Cache kết quả Slither (data/slither_results/) và artifact biên dịch (data/slither_artifacts/)
+    # Đặt SLITHER_CACHE=0 để luôn biên dịch và phân tích lại
+    SLITHER_CACHE_ENABLED = os.environ.get("SLITHER_CACHE", "1") != "0"
+    
     # === CẤU HÌNH CHIẾN DỊCH ===
     
     # Địa chỉ hợp đồng mục tiêu mà chiến dịch sẽ tương tác
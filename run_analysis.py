@@ -115,6 +115,8 @@ Ví dụ sử dụng:
         use_cache=use_cache,
         save_cache=save_cache
     )
+    # Pillar 1 đã xong: dừng executor / tiến trình Slither và đóng Session Etherscan
+    risk_analyzer.close()
 
     # 6. Lấy các khuyến nghị chiến lược
     analysis_service.generate_strategic_recommendations()